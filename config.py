@@ -1,6 +1,7 @@
 """Application configuration from environment variables."""
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 from dotenv import load_dotenv
 
@@ -8,7 +9,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Settings:
     """Application settings loaded from environment variables."""
 
@@ -17,13 +18,24 @@ class Settings:
     log_level: str = "INFO"
     base_url: str = ""
 
-    def __init__(self):
-        """Initialize settings from environment variables."""
-        self.session_limit = int(os.getenv("SESSION_LIMIT", "100"))
-        self.session_timeout_minutes = int(os.getenv("SESSION_TIMEOUT_MINUTES", "30"))
-        self.log_level = os.getenv("LOG_LEVEL", "INFO")
-        self.base_url = os.getenv("BASE_URL", "")
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Read settings from environment variables.
+
+    The environment is parsed only once; later calls return the cached instance.
+
+    Returns:
+        The application Settings.
+    """
+    env = os.environ
+    return Settings(
+        session_limit=int(env.get("SESSION_LIMIT", "100")),
+        session_timeout_minutes=int(env.get("SESSION_TIMEOUT_MINUTES", "30")),
+        log_level=env.get("LOG_LEVEL", "INFO"),
+        base_url=env.get("BASE_URL", ""),
+    )
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
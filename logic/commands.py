@@ -1,8 +1,12 @@
 """Command definitions for fencing footwork training."""
-from dataclasses import dataclass
+import json
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
 
 
-@dataclass
+@dataclass(slots=True)
 class Command:
     """A fencing command with French and Japanese translations."""
 
@@ -12,15 +16,33 @@ class Command:
     audio_file: str
     is_weapon_specific: bool = False
     weapons: list[str] | None = None
-
-    def to_dict(self) -> dict:
-        """Convert to dict format for SSE events."""
-        return {
+    _cached_dict: Mapping[str, str] = field(init=False, repr=False, compare=False)
+    _cached_json: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Precompute the SSE payload once, since commands are static."""
+        # Interned IDs let equality checks in the generators short-circuit
+        # on identity, even for commands built from runtime strings
+        self.id = sys.intern(self.id)
+        payload = {
             "id": self.id,
             "fr": self.french,
             "jp": self.japanese,
             "audio": f"/static/audio/{self.audio_file}",
         }
+        self._cached_json = json.dumps(payload, ensure_ascii=False)
+        self._cached_dict = MappingProxyType(payload)
+
+    def to_dict(self) -> Mapping[str, str]:
+        """Convert to dict format for SSE events.
+
+        Returns a read-only view of the shared precomputed payload.
+        """
+        return self._cached_dict
+
+    def to_json(self) -> str:
+        """Return the precomputed JSON string of to_dict() for SSE events."""
+        return self._cached_json
 
 
 # All available fencing commands
@@ -108,6 +130,26 @@ COMMAND_SETS: dict[str, list[str]] = {
     "advanced": ["marche", "rompe", "fendez", "remise", "bond_avant", "bond_arriere", "balancez"],
 }
 
+# Immutable views of COMMAND_SETS, usable as cache keys
+_COMMAND_SETS_RESOLVED: dict[str, tuple[str, ...]] = {
+    name: tuple(ids) for name, ids in COMMAND_SETS.items()
+}
+_DEFAULT_COMMAND_SET = _COMMAND_SETS_RESOLVED["beginner"]
+
+
+def resolve_command_set(name: str) -> tuple[str, ...]:
+    """Get the command IDs for a difficulty level.
+
+    Args:
+        name: Difficulty level ("beginner", "intermediate", "advanced").
+
+    Returns:
+        Tuple of command IDs, falling back to the beginner set for
+        unknown levels.
+    """
+    return _COMMAND_SETS_RESOLVED.get(name, _DEFAULT_COMMAND_SET)
+
+
 # Drill pairs for basic mode pair training
 DRILL_PAIRS: dict[str, tuple[str, str]] = {
     "marche_rompe": ("marche", "rompe"),
@@ -134,6 +176,10 @@ POSITION_EFFECTS: dict[str, float] = {
     "halte": 0.0,  # Stop command - no position change
 }
 
+# Position tracking constants
+POSITION_SOFT_LIMIT = 3.0  # Beyond this, bias toward return
+POSITION_HARD_LIMIT = 5.0  # Beyond this, force return direction
+
 
 def get_command(command_id: str) -> Command:
     """Get a command by its ID.
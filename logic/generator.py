@@ -1,25 +1,49 @@
 """Command generation per training mode."""
 import random
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import Optional
-
+from functools import lru_cache, partial
+from itertools import accumulate, chain, repeat
+from typing import Callable, Collection, Iterator, Mapping, NamedTuple, Optional, Sequence
+
+from logic.commands import (
+    COMMANDS,
+    POSITION_EFFECTS,
+    POSITION_HARD_LIMIT,
+    POSITION_SOFT_LIMIT,
+    resolve_command_set,
+)
+from logic.phrases import get_phrases_for_difficulty, select_balanced_phrase
 from logic.session import CombinationConfig, IntervalConfig
+from logic.weapons import WeaponProfile, get_weapon_profile
+
+_random = random.random
 
 
 # Combination patterns as defined in plan.md
-PATTERNS: dict[str, list[str]] = {
+PATTERNS: dict[str, tuple[str, ...]] = {
     # Pattern A (前進攻撃): マルシェ → マルシェ → アロンジェ・ル・ブラ → ファンドゥ → ルミーズ・アンギャルド
-    "A": ["marche", "marche", "allongez", "fendez", "remise"],
+    "A": ("marche", "marche", "allongez", "fendez", "remise"),
     # Pattern B (後退からの反撃): ロンペ → ロンペ → マルシェ → ファンドゥ → ルミーズ・アンギャルド
-    "B": ["rompe", "rompe", "marche", "fendez", "remise"],
+    "B": ("rompe", "rompe", "marche", "fendez", "remise"),
     # Pattern C (フットワーク強化): マルシェ → マルシェ → ロンペ → マルシェ → ロンペ → ロンペ
-    "C": ["marche", "marche", "rompe", "marche", "rompe", "rompe"],
+    "C": ("marche", "marche", "rompe", "marche", "rompe", "rompe"),
 }
 
 # Direction classification for wall prevention
-FORWARD_COMMANDS = {"marche", "double_marche", "bond_avant"}
-BACKWARD_COMMANDS = {"rompe", "bond_arriere"}
-BOND_COMMANDS = {"bond_avant", "bond_arriere"}
+FORWARD_COMMANDS = frozenset({"marche", "double_marche", "bond_avant"})
+BACKWARD_COMMANDS = frozenset({"rompe", "bond_arriere"})
+BOND_COMMANDS = frozenset({"bond_avant", "bond_arriere"})
+
+# Integer direction codes used on hot paths instead of direction strings
+DIR_NEUTRAL, DIR_FORWARD, DIR_BACKWARD = 0, 1, 2
+_DIRECTION_NAMES = ("neutral", "forward", "backward")
+_DIRECTION_CODES = {name: code for code, name in enumerate(_DIRECTION_NAMES)}
+
+# Precomputed command -> direction code (commands not listed are neutral)
+_DIRECTION: dict[str, int] = {c: DIR_FORWARD for c in FORWARD_COMMANDS} | {
+    c: DIR_BACKWARD for c in BACKWARD_COMMANDS
+}
 
 # Wall prevention threshold (avoid 5+ consecutive same-direction)
 WALL_THRESHOLD = 4
@@ -37,6 +61,12 @@ COMMAND_TRANSITIONS: dict[str, dict] = {
     },
 }
 
+# COMMAND_TRANSITIONS unpacked into (next_preferred, preferred_weight) tuples
+_TRANSITIONS: dict[str, tuple[tuple[str, ...], float]] = {
+    cmd: (tuple(rule.get("next_preferred", ())), rule.get("preferred_weight", 0.5))
+    for cmd, rule in COMMAND_TRANSITIONS.items()
+}
+
 
 def generate_combination(config: CombinationConfig) -> list[str]:
     """Generate command sequence for combination mode.
@@ -47,11 +77,28 @@ def generate_combination(config: CombinationConfig) -> list[str]:
     Returns:
         List of command IDs to execute.
 
+    Raises:
+        KeyError: If pattern_id is not found.
+    """
+    return list(generate_combination_iter(config))
+
+
+def generate_combination_iter(config: CombinationConfig) -> Iterator[str]:
+    """Lazily generate the command sequence for combination mode.
+
+    Same sequence as generate_combination, without materializing the list.
+
+    Args:
+        config: Combination mode configuration with pattern_id and repetitions.
+
+    Returns:
+        Iterator over command IDs to execute.
+
     Raises:
         KeyError: If pattern_id is not found.
     """
     pattern = PATTERNS[config.pattern_id]
-    return pattern * config.repetitions
+    return chain.from_iterable(repeat(pattern, config.repetitions))
 
 
 def generate_interval_work_commands(config: IntervalConfig) -> list[str]:
@@ -65,19 +112,45 @@ def generate_interval_work_commands(config: IntervalConfig) -> list[str]:
     Returns:
         List of command IDs for the work phase.
     """
-    from logic.commands import COMMAND_SETS
-
-    command_set = COMMAND_SETS["intermediate"]
+    command_set = resolve_command_set("intermediate")
     command_count = int(config.work_seconds * config.tempo_bpm / 60)
+    ctx = build_context(command_set)
 
-    commands = []
-    history: list[str] = []
+    commands: list[str] = []
+    streak = StreakTracker()
     last_cmd: Optional[str] = None
 
-    for _ in range(command_count):
-        cmd = select_constrained_command(command_set, history, last_cmd)
-        commands.append(cmd)
-        history.append(cmd)
+    # Bind loop invariants to locals to cut attribute and global lookups
+    rule_for = _RULE_FOR_LAST.get
+    has_commands = bool(ctx.commands)
+    append = commands.append
+    update_streak = streak.update
+
+    # Speculatively draw every slot in one call; the loop only redraws the
+    # rare slots where a rule or the wall check applies
+    draws = (
+        random.choices(ctx.commands, cum_weights=ctx.cum_weights, k=command_count)
+        if has_commands
+        else []
+    )
+
+    for i in range(command_count):
+        # Fendez must be followed by remise, then transition rules apply
+        rule = rule_for(last_cmd)
+        cmd = rule(ctx) if rule is not None else None
+
+        if cmd is None:
+            if has_commands:
+                cmd = draws[i]
+                if is_wall_risk_fast(streak, cmd):
+                    # Redraw from the table that excludes wall risks
+                    cmd = _pick(*_wall_safe_table(ctx, streak))
+            else:
+                # Everything filtered out by weapon: use the fallback path
+                cmd = select_with_context(ctx, [], last_cmd, streak)
+
+        append(cmd)
+        update_streak(cmd)
         last_cmd = cmd
 
     return commands
@@ -92,12 +165,7 @@ def classify_command_direction(command_id: str) -> str:
     Returns:
         One of "forward", "backward", or "neutral".
     """
-    if command_id in FORWARD_COMMANDS:
-        return "forward"
-    elif command_id in BACKWARD_COMMANDS:
-        return "backward"
-    else:
-        return "neutral"
+    return _DIRECTION_NAMES[_DIRECTION.get(command_id, DIR_NEUTRAL)]
 
 
 def should_force_remise(last_command: str) -> bool:
@@ -134,15 +202,18 @@ def count_consecutive_direction(history: list[str], direction: str) -> int:
     Returns:
         Number of consecutive commands in that direction at the end.
     """
-    if not history:
-        return 0
+    return _count_consecutive(history, _DIRECTION_CODES.get(direction, -1))
 
+
+def _count_consecutive(history: list[str], direction: int) -> int:
+    """count_consecutive_direction for an integer direction code."""
+    get_direction = _DIRECTION.get
     count = 0
     for cmd in reversed(history):
-        cmd_dir = classify_command_direction(cmd)
+        cmd_dir = get_direction(cmd, DIR_NEUTRAL)
         if cmd_dir == direction:
             count += 1
-        elif cmd_dir != "neutral":
+        elif cmd_dir != DIR_NEUTRAL:
             # Different direction ends the streak
             break
         # Neutral commands don't break the streak but don't count
@@ -163,37 +234,97 @@ def is_wall_risk(history: list[str], proposed_command: str) -> bool:
     Returns:
         True if this would exceed wall threshold.
     """
-    proposed_dir = classify_command_direction(proposed_command)
-    if proposed_dir == "neutral":
+    proposed_dir = _DIRECTION.get(proposed_command)
+    if proposed_dir is None:
         return False
 
-    consecutive = count_consecutive_direction(history, proposed_dir)
+    consecutive = _count_consecutive(history, proposed_dir)
     return consecutive >= WALL_THRESHOLD
 
 
+@dataclass(slots=True)
+class StreakTracker:
+    """Running count of consecutive same-direction commands.
+
+    Equivalent to count_consecutive_direction over the full history,
+    but updated in O(1) as each command is emitted.
+    """
+
+    direction: int = DIR_NEUTRAL
+    length: int = 0
+
+    def update(self, command_id: str) -> None:
+        """Record an emitted command.
+
+        Args:
+            command_id: The command that was emitted.
+        """
+        cmd_dir = _DIRECTION.get(command_id, DIR_NEUTRAL)
+        if cmd_dir == DIR_NEUTRAL:
+            # Neutral commands don't break the streak but don't count
+            return
+        if cmd_dir == self.direction:
+            self.length += 1
+        else:
+            self.direction = cmd_dir
+            self.length = 1
+
+    @classmethod
+    def from_history(cls, history: list[str]) -> "StreakTracker":
+        """Build a tracker matching an existing command history.
+
+        Args:
+            history: List of previous command IDs.
+
+        Returns:
+            A StreakTracker reflecting the end of history.
+        """
+        tracker = cls()
+        for command_id in history:
+            tracker.update(command_id)
+        return tracker
+
+
+def is_wall_risk_fast(tracker: StreakTracker, proposed_command: str) -> bool:
+    """Check wall risk against a StreakTracker instead of scanning history.
+
+    Args:
+        tracker: Streak state for the commands emitted so far.
+        proposed_command: The command being considered.
+
+    Returns:
+        True if this would exceed wall threshold.
+    """
+    proposed_dir = _DIRECTION.get(proposed_command)
+    return (
+        proposed_dir is not None
+        and proposed_dir == tracker.direction
+        and tracker.length >= WALL_THRESHOLD
+    )
+
+
 def get_preferred_next_command(
     last_command: str,
-    command_set: list[str],
+    command_set: Collection[str],
 ) -> Optional[str]:
     """Get preferred next command based on transition rules.
 
     Args:
         last_command: The previous command ID.
-        command_set: Available commands to select from.
+        command_set: Available commands to select from (a set is fastest).
 
     Returns:
         A preferred command ID if rule matches and command available,
         None otherwise.
     """
-    if last_command not in COMMAND_TRANSITIONS:
+    rule = _TRANSITIONS.get(last_command)
+    if rule is None:
         return None
 
-    rule = COMMAND_TRANSITIONS[last_command]
-    preferred = rule.get("next_preferred", [])
-    weight = rule.get("preferred_weight", 0.5)
+    preferred, weight = rule
 
     # Filter to commands available in command_set
-    available_preferred = [cmd for cmd in preferred if cmd in command_set]
+    available_preferred = tuple(cmd for cmd in preferred if cmd in command_set)
     if not available_preferred:
         return None
 
@@ -204,11 +335,152 @@ def get_preferred_next_command(
     return None
 
 
+class SelectionContext(NamedTuple):
+    """Precomputed selection tables for a (command_set, weapon) pair.
+
+    Attributes:
+        command_set: The original command set.
+        filtered: Commands remaining after weapon filtering.
+        filtered_set: filtered as a frozenset for membership tests.
+        weighted: (command_id, weight) pairs with zero weights excluded.
+        commands: Command IDs of weighted, in the same order.
+        cum_weights: Cumulative weights aligned with commands.
+        fallback_weighted: Weights applied to the unfiltered command_set,
+            used only if weapon filtering leaves nothing to select.
+        without_direction: (commands, cum_weights) tables keyed by
+            DIR_FORWARD or DIR_BACKWARD, with that direction's commands
+            removed, used while it is at the wall threshold.
+    """
+
+    command_set: tuple[str, ...]
+    filtered: tuple[str, ...]
+    filtered_set: frozenset[str]
+    weighted: tuple[tuple[str, float], ...]
+    commands: tuple[str, ...]
+    cum_weights: tuple[float, ...]
+    fallback_weighted: tuple[tuple[str, float], ...]
+    without_direction: dict[int, tuple[tuple[str, ...], tuple[float, ...]]]
+
+
+@lru_cache(maxsize=32)
+def _prepare_selection_context(
+    command_set: tuple[str, ...],
+    weapon: str,
+) -> SelectionContext:
+    """Build (and cache) the SelectionContext for a command set and weapon."""
+    profile = get_weapon_profile(weapon)
+    filtered = filter_commands_for_weapon(list(command_set), weapon, profile)
+    weighted = weapon_weighted_commands(tuple(filtered), weapon)
+    return SelectionContext(
+        command_set=command_set,
+        filtered=tuple(filtered),
+        filtered_set=frozenset(filtered),
+        weighted=weighted,
+        commands=tuple(cmd for cmd, _ in weighted),
+        cum_weights=tuple(accumulate(weight for _, weight in weighted)),
+        fallback_weighted=weapon_weighted_commands(command_set, weapon),
+        without_direction={
+            direction: _table_without(weighted, direction)
+            for direction in (DIR_FORWARD, DIR_BACKWARD)
+        },
+    )
+
+
+def _table_without(
+    weighted: tuple[tuple[str, float], ...],
+    direction: int,
+) -> tuple[tuple[str, ...], tuple[float, ...]]:
+    """Build a (commands, cum_weights) table excluding one direction."""
+    kept = [(cmd, weight) for cmd, weight in weighted if _DIRECTION.get(cmd) != direction]
+    return (
+        tuple(cmd for cmd, _ in kept),
+        tuple(accumulate(weight for _, weight in kept)),
+    )
+
+
+def _pick(commands: Sequence[str], cum_weights: Sequence[float]) -> str:
+    """Draw one command from parallel command and cumulative-weight lists.
+
+    Equivalent to random.choices(commands, cum_weights=cum_weights, k=1)[0]
+    without the per-call argument handling.
+
+    Args:
+        commands: Non-empty sequence of command IDs.
+        cum_weights: Cumulative weights matching commands.
+
+    Returns:
+        Selected command ID.
+    """
+    # hi bound guards against random() * total rounding up to total
+    idx = bisect_right(cum_weights, _random() * cum_weights[-1], 0, len(cum_weights) - 1)
+    return commands[idx]
+
+
+def _force_remise(ctx: SelectionContext) -> Optional[str]:
+    """Rule after fendez: remise is mandatory."""
+    return "remise"
+
+
+def _apply_transition(last_command: str, ctx: SelectionContext) -> Optional[str]:
+    """Rule for commands with COMMAND_TRANSITIONS entries."""
+    return get_preferred_next_command(last_command, ctx.filtered_set)
+
+
+# Rule to apply for each previous command; commands without an entry go
+# straight to weighted sampling
+_RULE_FOR_LAST: dict[str, Callable[[SelectionContext], Optional[str]]] = {
+    **{cmd: partial(_apply_transition, cmd) for cmd in _TRANSITIONS},
+    "fendez": _force_remise,
+}
+
+
+def _wall_safe_table(
+    ctx: SelectionContext,
+    streak: StreakTracker,
+) -> tuple[tuple[str, ...], tuple[float, ...]]:
+    """Get the (commands, cum_weights) table that avoids wall risk.
+
+    Args:
+        ctx: Selection context with at least one weighted command.
+        streak: Streak state for the commands emitted so far.
+
+    Returns:
+        The table without the streak's direction once it reaches the wall
+        threshold, or the full table if no filtering is needed or every
+        command would be a wall risk.
+    """
+    if streak.length >= WALL_THRESHOLD:
+        table = ctx.without_direction.get(streak.direction)
+        if table is not None and table[0]:
+            return table
+    return ctx.commands, ctx.cum_weights
+
+
+def build_context(command_set: Collection[str], weapon: str = "foil") -> SelectionContext:
+    """Get the selection context for a command set and weapon.
+
+    Weapon filtering and weighting only depend on these two inputs, so
+    generators build the context once and reuse it for every selection.
+
+    Args:
+        command_set: Available commands to select from.
+        weapon: Weapon type for filtering ('foil', 'epee', 'sabre').
+
+    Returns:
+        The SelectionContext.
+
+    Raises:
+        KeyError: If the weapon type is not found.
+    """
+    return _prepare_selection_context(tuple(command_set), weapon)
+
+
 def select_constrained_command(
     command_set: list[str],
     history: list[str],
     last_command: Optional[str],
     weapon: str = "foil",
+    streak: Optional[StreakTracker] = None,
 ) -> str:
     """Select a command respecting all constraints and weapon filtering.
 
@@ -224,48 +496,56 @@ def select_constrained_command(
         history: Previous commands for constraint checking.
         last_command: The immediately previous command (for fendez rule).
         weapon: Weapon type for filtering ('foil', 'epee', 'sabre').
+        streak: Optional running streak state matching history; when given,
+            wall risk is checked in O(1) instead of rescanning history.
 
     Returns:
         Selected command ID.
     """
-    from logic.weapons import get_weapon_profile
-
-    # Rule 1: Fendez must be followed by remise
-    if last_command and should_force_remise(last_command):
-        return "remise"
+    ctx = build_context(command_set, weapon)
+    return select_with_context(ctx, history, last_command, streak)
 
-    # Apply weapon filtering
-    profile = get_weapon_profile(weapon)
-    filtered_commands = filter_commands_for_weapon(command_set, weapon, profile)
 
-    # Rule 2: Apply command transition rules
-    if last_command:
-        preferred = get_preferred_next_command(last_command, filtered_commands)
-        if preferred:
-            return preferred
+def select_with_context(
+    ctx: SelectionContext,
+    history: list[str],
+    last_command: Optional[str],
+    streak: Optional[StreakTracker] = None,
+) -> str:
+    """Select a command using a prebuilt SelectionContext.
 
-    weighted_commands = apply_weapon_weights(filtered_commands, profile.command_weights)
+    Applies the same constraints as select_constrained_command.
 
-    # Filter out wall risk commands
-    safe_weighted = [
-        (cmd, weight) for cmd, weight in weighted_commands
-        if not is_wall_risk(history, cmd)
-    ]
+    Args:
+        ctx: Selection context from build_context.
+        history: Previous commands for constraint checking.
+        last_command: The immediately previous command (for fendez rule).
+        streak: Optional running streak state matching history.
 
-    # Fallback: if all commands would cause wall risk, use all weighted commands
-    if not safe_weighted:
-        safe_weighted = weighted_commands
+    Returns:
+        Selected command ID.
+    """
+    # Rule 1: Fendez must be followed by remise
+    # Rule 2: Apply command transition rules
+    rule = _RULE_FOR_LAST.get(last_command)
+    if rule is not None:
+        forced = rule(ctx)
+        if forced:
+            return forced
+
+    # Wall-risk filtering reduces to choosing a precomputed table; if all
+    # commands would cause wall risk, the full table is used
+    if ctx.commands:
+        if streak is None:
+            streak = StreakTracker.from_history(history)
+        return _pick(*_wall_safe_table(ctx, streak))
 
     # Fallback: if weighted_commands is empty (all commands filtered out)
     # Apply weights to original command_set (preserves weapon filtering)
-    if not safe_weighted:
-        fallback_weighted = apply_weapon_weights(command_set, profile.command_weights)
-        if fallback_weighted:
-            return select_weighted_command(fallback_weighted)
-        # Ultimate fallback - this shouldn't happen normally
-        return random.choice(command_set)
-
-    return select_weighted_command(safe_weighted)
+    if ctx.fallback_weighted:
+        return select_weighted_command(list(ctx.fallback_weighted))
+    # Ultimate fallback - this shouldn't happen normally
+    return random.choice(ctx.command_set)
 
 
 def get_post_command_delay(command_id: str, base_delay: float) -> float:
@@ -278,15 +558,42 @@ def get_post_command_delay(command_id: str, base_delay: float) -> float:
     Returns:
         Adjusted delay in seconds.
     """
-    if is_bond_command(command_id):
+    if command_id in BOND_COMMANDS:
         return base_delay * 1.5
     return base_delay
 
 
+def iter_random_intervals(
+    min_ms: int,
+    max_ms: int,
+    tempo_multiplier: float = 1.0,
+    batch_size: int = 32,
+) -> Iterator[float]:
+    """Yield random base delays for random mode, drawn in batches.
+
+    Each delay is a whole number of milliseconds in [min_ms, max_ms],
+    converted to seconds and scaled by the weapon tempo.
+
+    Args:
+        min_ms: Minimum interval in milliseconds.
+        max_ms: Maximum interval in milliseconds.
+        tempo_multiplier: Weapon tempo multiplier (higher is faster).
+        batch_size: Number of delays drawn per RNG call.
+
+    Yields:
+        Delays in seconds.
+    """
+    choices = range(min_ms, max_ms + 1)
+    scale = 1 / (1000.0 * tempo_multiplier)
+    while True:
+        for ms in random.choices(choices, k=batch_size):
+            yield ms * scale
+
+
 def filter_commands_for_weapon(
     command_ids: list[str],
     weapon: str,
-    profile: "WeaponProfile",
+    profile: WeaponProfile,
 ) -> list[str]:
     """Filter commands based on weapon restrictions and add weapon-specific commands.
 
@@ -298,9 +605,22 @@ def filter_commands_for_weapon(
     Returns:
         Filtered list of command IDs.
     """
-    from logic.commands import COMMANDS
+    return list(
+        _filter_commands_for_weapon_cached(
+            tuple(command_ids), weapon, tuple(profile.additional_commands)
+        )
+    )
+
 
+@lru_cache(maxsize=64)
+def _filter_commands_for_weapon_cached(
+    command_ids: tuple[str, ...],
+    weapon: str,
+    additional: tuple[str, ...],
+) -> tuple[str, ...]:
+    """Cached implementation of filter_commands_for_weapon."""
     result = []
+    seen: set[str] = set()
 
     for cmd_id in command_ids:
         cmd = COMMANDS.get(cmd_id)
@@ -311,27 +631,30 @@ def filter_commands_for_weapon(
             # Only include if this weapon is allowed
             if cmd.weapons and weapon in cmd.weapons:
                 result.append(cmd_id)
+                seen.add(cmd_id)
         else:
             # Non-weapon-specific commands are always included
             result.append(cmd_id)
+            seen.add(cmd_id)
 
     # Add weapon-specific additional commands
-    for cmd_id in profile.additional_commands:
-        if cmd_id not in result:
+    for cmd_id in additional:
+        if cmd_id not in seen:
             result.append(cmd_id)
+            seen.add(cmd_id)
 
-    return result
+    return tuple(result)
 
 
 def apply_weapon_weights(
     command_ids: list[str],
-    weights: dict[str, float],
+    weights: Mapping[str, float],
 ) -> list[tuple[str, float]]:
     """Apply weapon-specific weights to commands.
 
     Args:
         command_ids: List of command IDs.
-        weights: Dict mapping command_id to weight (default 1.0, 0.0 = excluded).
+        weights: Mapping of command_id to weight (default 1.0, 0.0 = excluded).
 
     Returns:
         List of (command_id, weight) tuples, excluding zero-weight commands.
@@ -346,6 +669,27 @@ def apply_weapon_weights(
     return result
 
 
+@lru_cache(maxsize=32)
+def weapon_weighted_commands(
+    command_ids: tuple[str, ...],
+    weapon: str,
+) -> tuple[tuple[str, float], ...]:
+    """Apply a weapon profile's weights to commands, cached per weapon.
+
+    Keyed on the hashable (command_ids, weapon) pair so repeated lookups
+    do not rebuild a key from the weights mapping.
+
+    Args:
+        command_ids: Command IDs to weight.
+        weapon: Weapon type whose profile supplies the weights.
+
+    Returns:
+        Tuple of (command_id, weight) pairs, excluding zero-weight commands.
+    """
+    weights = get_weapon_profile(weapon).command_weights
+    return tuple(apply_weapon_weights(command_ids, weights))
+
+
 def select_weighted_command(weighted_commands: list[tuple[str, float]]) -> str:
     """Select a command using weighted random choice.
 
@@ -361,16 +705,12 @@ def select_weighted_command(weighted_commands: list[tuple[str, float]]) -> str:
     if not weighted_commands:
         raise ValueError("No commands available for selection")
 
-    commands, weights = zip(*weighted_commands)
-    return random.choices(commands, weights=weights, k=1)[0]
-
+    commands = [cmd for cmd, _ in weighted_commands]
+    cum_weights = list(accumulate(weight for _, weight in weighted_commands))
+    return _pick(commands, cum_weights)
 
-# Position tracking constants
-POSITION_SOFT_LIMIT = 3.0  # Beyond this, bias toward return
-POSITION_HARD_LIMIT = 5.0  # Beyond this, force return direction
 
-
-@dataclass
+@dataclass(slots=True)
 class PositionTracker:
     """Track fencer position relative to starting en garde position.
 
@@ -386,8 +726,6 @@ class PositionTracker:
         Args:
             command_id: The command that was executed.
         """
-        from logic.commands import POSITION_EFFECTS
-
         effect = POSITION_EFFECTS.get(command_id, 0.0)
         self.position += effect
 
@@ -410,6 +748,40 @@ class PositionTracker:
         return "neutral"
 
 
+@lru_cache(maxsize=32)
+def allowed_weapon_commands(
+    command_set: tuple[str, ...],
+    weapon: str,
+) -> frozenset[str]:
+    """Build the set of phrase commands a weapon may emit.
+
+    Intersects the difficulty command set with the commands the weapon
+    allows: zero-weight commands and weapon-specific commands for other
+    weapons are excluded. Cached, so per-command checks in the random
+    and interval loops are a single set lookup.
+
+    Args:
+        command_set: Command IDs for the difficulty level.
+        weapon: Weapon type for filtering.
+
+    Returns:
+        Frozenset of allowed command IDs.
+    """
+    weights = get_weapon_profile(weapon).command_weights
+    allowed = set()
+
+    for cmd_id in command_set:
+        if weights.get(cmd_id, 1.0) == 0.0:
+            continue
+        cmd_obj = COMMANDS.get(cmd_id)
+        if cmd_obj and cmd_obj.is_weapon_specific:
+            if cmd_obj.weapons and weapon not in cmd_obj.weapons:
+                continue
+        allowed.add(cmd_id)
+
+    return frozenset(allowed)
+
+
 def generate_random_commands(
     command_set: str,
     count: int,
@@ -428,9 +800,6 @@ def generate_random_commands(
     Returns:
         List of command IDs.
     """
-    from logic.phrases import get_phrases_for_difficulty, select_balanced_phrase
-    from logic.commands import COMMAND_SETS
-
     # Get available phrases for difficulty
     phrases = get_phrases_for_difficulty(command_set)
 
@@ -442,7 +811,10 @@ def generate_random_commands(
     last_cmd: Optional[str] = None
 
     # Get actual command set for constraint checking
-    actual_command_set = COMMAND_SETS.get(command_set, COMMAND_SETS["beginner"])
+    actual_command_set = resolve_command_set(command_set)
+
+    # Commands that survive difficulty and weapon filtering
+    allowed = allowed_weapon_commands(actual_command_set, weapon)
 
     while len(commands) < count:
         # Select a phrase based on current position
@@ -454,38 +826,23 @@ def generate_random_commands(
                 break
 
             # Apply fendez->remise rule
-            if last_cmd and should_force_remise(last_cmd):
+            if last_cmd == "fendez":
                 cmd = "remise"
 
             # Skip consecutive remise (never allow remise after remise)
-            if cmd == "remise" and last_cmd == "remise":
+            elif cmd == "remise" and last_cmd == "remise":
                 continue
 
             # Apply command transition rules (except when fendez->remise forced)
-            elif last_cmd and last_cmd != "fendez":
+            elif last_cmd:
                 preferred = get_preferred_next_command(last_cmd, actual_command_set)
-                if preferred and preferred in actual_command_set:
+                if preferred:
                     cmd = preferred
 
-            # Skip commands not in command set (for difficulty filtering)
-            if cmd not in actual_command_set:
+            # Single membership check replaces the difficulty and weapon filters
+            if cmd not in allowed:
                 continue
 
-            # Apply weapon filtering
-            from logic.weapons import get_weapon_profile
-            profile = get_weapon_profile(weapon)
-
-            # Skip if command is filtered out by weapon
-            if cmd in profile.command_weights and profile.command_weights[cmd] == 0.0:
-                continue
-
-            # Check weapon-specific commands
-            from logic.commands import COMMANDS
-            cmd_obj = COMMANDS.get(cmd)
-            if cmd_obj and cmd_obj.is_weapon_specific:
-                if cmd_obj.weapons and weapon not in cmd_obj.weapons:
-                    continue
-
             commands.append(cmd)
             tracker.apply_command(cmd)
             last_cmd = cmd
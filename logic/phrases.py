@@ -1,10 +1,14 @@
 """Phrase-based command generation for natural movement sequences."""
 import random
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Optional
+from itertools import accumulate
+from typing import NamedTuple, Optional, Sequence
 
+from logic.commands import POSITION_HARD_LIMIT, POSITION_SOFT_LIMIT
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Phrase:
     """A meaningful sequence of fencing commands.
 
@@ -14,7 +18,7 @@ class Phrase:
 
     id: str
     name: str
-    commands: list[str]
+    commands: tuple[str, ...]
     net_movement: float  # Total position change after phrase
     difficulty: str  # "beginner", "intermediate", "advanced"
     weight: float = 1.0  # Selection weight (0.5 for attack phrases with remise)
@@ -26,21 +30,21 @@ PHRASES: dict[str, Phrase] = {
     "simple_advance": Phrase(
         id="simple_advance",
         name="Simple Advance",
-        commands=["marche", "marche"],
+        commands=("marche", "marche"),
         net_movement=2.0,
         difficulty="beginner",
     ),
     "simple_retreat": Phrase(
         id="simple_retreat",
         name="Simple Retreat",
-        commands=["rompe", "rompe"],
+        commands=("rompe", "rompe"),
         net_movement=-2.0,
         difficulty="beginner",
     ),
     "footwork_basic": Phrase(
         id="footwork_basic",
         name="Basic Footwork",
-        commands=["marche", "rompe", "marche", "rompe"],
+        commands=("marche", "rompe", "marche", "rompe"),
         net_movement=0.0,
         difficulty="beginner",
     ),
@@ -48,7 +52,7 @@ PHRASES: dict[str, Phrase] = {
     "advance_attack": Phrase(
         id="advance_attack",
         name="Advance Attack",
-        commands=["marche", "marche", "fendez", "remise"],
+        commands=("marche", "marche", "fendez", "remise"),
         net_movement=2.0,  # 1 + 1 + 2 - 2 = 2
         difficulty="intermediate",
         weight=0.5,  # Reduced weight to lower remise frequency
@@ -56,7 +60,7 @@ PHRASES: dict[str, Phrase] = {
     "retreat_counter": Phrase(
         id="retreat_counter",
         name="Retreat Counter",
-        commands=["rompe", "rompe", "marche", "fendez", "remise"],
+        commands=("rompe", "rompe", "marche", "fendez", "remise"),
         net_movement=-1.0,  # -1 - 1 + 1 + 2 - 2 = -1
         difficulty="intermediate",
         weight=0.5,  # Reduced weight to lower remise frequency
@@ -64,7 +68,7 @@ PHRASES: dict[str, Phrase] = {
     "prep_attack": Phrase(
         id="prep_attack",
         name="Prep Attack",
-        commands=["allongez", "fendez", "remise"],
+        commands=("allongez", "fendez", "remise"),
         net_movement=0.0,  # 0 + 2 - 2 = 0
         difficulty="intermediate",
         weight=0.5,  # Reduced weight to lower remise frequency
@@ -72,14 +76,14 @@ PHRASES: dict[str, Phrase] = {
     "distance_adjust": Phrase(
         id="distance_adjust",
         name="Distance Adjust",
-        commands=["marche", "marche", "rompe"],
+        commands=("marche", "marche", "rompe"),
         net_movement=1.0,
         difficulty="intermediate",
     ),
     "retreat_distance": Phrase(
         id="retreat_distance",
         name="Retreat Distance",
-        commands=["rompe", "rompe", "marche"],
+        commands=("rompe", "rompe", "marche"),
         net_movement=-1.0,
         difficulty="intermediate",
     ),
@@ -87,14 +91,14 @@ PHRASES: dict[str, Phrase] = {
     "bond_drill": Phrase(
         id="bond_drill",
         name="Bond Drill",
-        commands=["bond_avant", "bond_arriere"],
+        commands=("bond_avant", "bond_arriere"),
         net_movement=0.0,  # 1.5 - 1.5 = 0
         difficulty="advanced",
     ),
     "aggressive_advance": Phrase(
         id="aggressive_advance",
         name="Aggressive Advance",
-        commands=["bond_avant", "marche", "fendez", "remise"],
+        commands=("bond_avant", "marche", "fendez", "remise"),
         net_movement=2.5,  # 1.5 + 1 + 2 - 2 = 2.5
         difficulty="advanced",
         weight=0.5,  # Reduced weight to lower remise frequency
@@ -102,14 +106,14 @@ PHRASES: dict[str, Phrase] = {
     "defensive_retreat": Phrase(
         id="defensive_retreat",
         name="Defensive Retreat",
-        commands=["bond_arriere", "rompe", "rompe"],
+        commands=("bond_arriere", "rompe", "rompe"),
         net_movement=-3.5,  # -1.5 - 1 - 1 = -3.5
         difficulty="advanced",
     ),
     "balancez_attack": Phrase(
         id="balancez_attack",
         name="Balancez Attack",
-        commands=["balancez", "marche", "fendez", "remise"],
+        commands=("balancez", "marche", "fendez", "remise"),
         net_movement=1.0,  # 0 + 1 + 2 - 2 = 1
         difficulty="advanced",
         weight=0.5,  # Reduced weight to lower remise frequency
@@ -117,31 +121,94 @@ PHRASES: dict[str, Phrase] = {
 }
 
 
-def get_phrases_for_difficulty(difficulty: str) -> list[Phrase]:
+# Phrases available at each difficulty level (each level includes the
+# easier ones), in PHRASES order
+_PHRASES_BY_DIFFICULTY: dict[str, tuple[Phrase, ...]] = {
+    difficulty: tuple(p for p in PHRASES.values() if p.difficulty in included)
+    for difficulty, included in (
+        ("beginner", {"beginner"}),
+        ("intermediate", {"beginner", "intermediate"}),
+        ("advanced", {"beginner", "intermediate", "advanced"}),
+    )
+}
+
+
+def get_phrases_for_difficulty(difficulty: str) -> tuple[Phrase, ...]:
     """Get phrases available for a given difficulty level.
 
     Args:
         difficulty: The difficulty level ("beginner", "intermediate", "advanced").
 
     Returns:
-        List of available Phrase objects for that level.
+        Tuple of available Phrase objects for that level. Unknown levels
+        fall back to beginner.
     """
-    valid_difficulties = {"beginner", "intermediate", "advanced"}
+    return _PHRASES_BY_DIFFICULTY.get(difficulty, _PHRASES_BY_DIFFICULTY["beginner"])
+
+
+class _PhraseTable(NamedTuple):
+    """Precomputed selection data for a sequence of phrases.
+
+    Attributes:
+        phrases: The phrases, in selection order.
+        not_forward: Phrases with net_movement <= 0 (for the forward hard limit).
+        not_backward: Phrases with net_movement >= 0 (for the backward hard limit).
+        neutral_cum: Cumulative base weights.
+        far_forward_cum: Cumulative weights biased toward backward movement.
+        far_backward_cum: Cumulative weights biased toward forward movement.
+    """
+
+    phrases: tuple[Phrase, ...]
+    not_forward: tuple[Phrase, ...]
+    not_backward: tuple[Phrase, ...]
+    neutral_cum: tuple[float, ...]
+    far_forward_cum: tuple[float, ...]
+    far_backward_cum: tuple[float, ...]
 
-    if difficulty not in valid_difficulties:
-        difficulty = "beginner"
 
-    if difficulty == "beginner":
-        return [p for p in PHRASES.values() if p.difficulty == "beginner"]
-    elif difficulty == "intermediate":
-        return [p for p in PHRASES.values() if p.difficulty in ("beginner", "intermediate")]
-    else:  # advanced
-        return list(PHRASES.values())
+def _biased_cum_weights(
+    phrases: tuple[Phrase, ...],
+    forward_factor: float,
+    backward_factor: float,
+) -> tuple[float, ...]:
+    """Cumulative phrase weights with direction bias factors applied."""
+    return tuple(
+        accumulate(
+            p.weight * (
+                forward_factor if p.net_movement > 0
+                else backward_factor if p.net_movement < 0
+                else 1.0
+            )
+            for p in phrases
+        )
+    )
+
+
+def _build_phrase_table(phrases: tuple[Phrase, ...]) -> _PhraseTable:
+    """Build the selection tables for a sequence of phrases."""
+    return _PhraseTable(
+        phrases=phrases,
+        not_forward=tuple(p for p in phrases if p.net_movement <= 0),
+        not_backward=tuple(p for p in phrases if p.net_movement >= 0),
+        neutral_cum=_biased_cum_weights(phrases, 1.0, 1.0),
+        # Far forward, prefer backward movement
+        far_forward_cum=_biased_cum_weights(phrases, 0.5, 2.0),
+        # Far backward, prefer forward movement
+        far_backward_cum=_biased_cum_weights(phrases, 2.0, 0.5),
+    )
+
+
+# Tables for the difficulty buckets, keyed by the identity of the shared
+# tuples returned by get_phrases_for_difficulty
+_PHRASE_TABLES: dict[int, _PhraseTable] = {
+    id(bucket): _build_phrase_table(bucket)
+    for bucket in _PHRASES_BY_DIFFICULTY.values()
+}
 
 
 def select_balanced_phrase(
     position: float,
-    available_phrases: list[Phrase],
+    available_phrases: Sequence[Phrase],
 ) -> Phrase:
     """Select a phrase considering current position for balance.
 
@@ -157,48 +224,34 @@ def select_balanced_phrase(
     Raises:
         ValueError: If available_phrases is empty.
     """
-    from logic.generator import POSITION_HARD_LIMIT, POSITION_SOFT_LIMIT
-
     if not available_phrases:
         raise ValueError("No phrases available for selection")
 
+    table = _PHRASE_TABLES.get(id(available_phrases))
+    if table is None or table.phrases is not available_phrases:
+        table = _build_phrase_table(tuple(available_phrases))
+    phrases = table.phrases
+
     # At hard limits, force direction
     if position > POSITION_HARD_LIMIT:
-        # Too far forward, must go backward or stay neutral
-        valid = [p for p in available_phrases if p.net_movement <= 0]
-        if valid:
-            return random.choice(valid)
-        # Fallback if no backward phrases available
-        return random.choice(available_phrases)
+        # Too far forward, must go backward or stay neutral; fall back to
+        # any phrase if no backward phrases are available
+        return random.choice(table.not_forward or phrases)
 
     if position < -POSITION_HARD_LIMIT:
         # Too far backward, must go forward or stay neutral
-        valid = [p for p in available_phrases if p.net_movement >= 0]
-        if valid:
-            return random.choice(valid)
-        # Fallback if no forward phrases available
-        return random.choice(available_phrases)
-
-    # Within limits, use weighted selection
-    weights = []
-    for phrase in available_phrases:
-        # Start with phrase's base weight (e.g., 0.5 for attack phrases)
-        weight = phrase.weight
-
-        # Beyond soft limit, bias toward return direction
-        if position > POSITION_SOFT_LIMIT:
-            # Far forward, prefer backward movement
-            if phrase.net_movement < 0:
-                weight *= 2.0  # Prefer backward
-            elif phrase.net_movement > 0:
-                weight *= 0.5  # Discourage forward
-        elif position < -POSITION_SOFT_LIMIT:
-            # Far backward, prefer forward movement
-            if phrase.net_movement > 0:
-                weight *= 2.0  # Prefer forward
-            elif phrase.net_movement < 0:
-                weight *= 0.5  # Discourage backward
-
-        weights.append(weight)
-
-    return random.choices(available_phrases, weights=weights, k=1)[0]
+        return random.choice(table.not_backward or phrases)
+
+    # Within limits, use weighted selection with the zone's precomputed
+    # cumulative weights
+    if position > POSITION_SOFT_LIMIT:
+        cum_weights = table.far_forward_cum
+    elif position < -POSITION_SOFT_LIMIT:
+        cum_weights = table.far_backward_cum
+    else:
+        # Near start: phrase's base weight (e.g., 0.5 for attack phrases)
+        cum_weights = table.neutral_cum
+
+    # hi bound guards against random() * total rounding up to total
+    idx = bisect_right(cum_weights, random.random() * cum_weights[-1], 0, len(phrases) - 1)
+    return phrases[idx]
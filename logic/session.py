@@ -1,9 +1,11 @@
 """Session state management for training sessions."""
-import uuid
+import heapq
+import secrets
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Union
+from typing import Callable, Optional, Union
 
 from config import settings
 
@@ -32,7 +34,7 @@ class TrainingMode(Enum):
     INTERVAL = "interval"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BasicConfig:
     """Configuration for Basic training mode."""
 
@@ -42,7 +44,7 @@ class BasicConfig:
     weapon: str = "foil"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CombinationConfig:
     """Configuration for Combination training mode."""
 
@@ -52,7 +54,7 @@ class CombinationConfig:
     weapon: str = "foil"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RandomConfig:
     """Configuration for Random training mode."""
 
@@ -63,7 +65,7 @@ class RandomConfig:
     weapon: str = "foil"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class IntervalConfig:
     """Configuration for Interval training mode."""
 
@@ -78,37 +80,63 @@ class IntervalConfig:
 SessionConfig = Union[BasicConfig, CombinationConfig, RandomConfig, IntervalConfig]
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     """A training session."""
 
     mode: TrainingMode
     config: SessionConfig
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    # Mirrors status == RUNNING as a plain bool for the streaming loops;
+    # kept in sync by _set_status, so change status via start()/stop() etc.
+    is_running: bool = field(default=False, init=False, repr=False, compare=False)
+    id: str = field(default_factory=lambda: secrets.token_hex(16))
     status: SessionStatus = SessionStatus.IDLE
     progress: dict = field(default_factory=dict)
     created_at: datetime = field(default_factory=datetime.now)
-    last_activity: datetime = field(default_factory=datetime.now)
+    # time.monotonic() seconds; only compared against other monotonic times.
+    # Update it via touch() so the manager's expiry heap sees the change
+    last_activity: float = field(default_factory=time.monotonic)
+    # Set by SessionManager to keep its running-session index and
+    # expiry heap current
+    on_status_change: Optional[Callable[["Session"], None]] = field(
+        default=None, repr=False, compare=False
+    )
+    on_activity: Optional[Callable[["Session"], None]] = field(
+        default=None, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        """Derive is_running from the status the session was created with."""
+        self.is_running = self.status is SessionStatus.RUNNING
+
+    def _set_status(self, status: SessionStatus) -> None:
+        """Change status and notify the owning manager, if any."""
+        self.status = status
+        self.is_running = status is SessionStatus.RUNNING
+        if self.on_status_change is not None:
+            self.on_status_change(self)
 
     def start(self) -> None:
         """Start the session."""
-        self.status = SessionStatus.RUNNING
+        self._set_status(SessionStatus.RUNNING)
 
     def stop(self) -> None:
         """Stop the session."""
-        self.status = SessionStatus.FINISHED
+        self._set_status(SessionStatus.FINISHED)
 
     def pause(self) -> None:
         """Pause the session."""
-        self.status = SessionStatus.PAUSED
+        self._set_status(SessionStatus.PAUSED)
 
     def resume(self) -> None:
         """Resume a paused session."""
-        self.status = SessionStatus.RUNNING
+        self._set_status(SessionStatus.RUNNING)
 
     def touch(self) -> None:
-        """Update last_activity timestamp."""
-        self.last_activity = datetime.now()
+        """Update last_activity timestamp and notify the owning manager."""
+        self.last_activity = time.monotonic()
+        if self.on_activity is not None:
+            self.on_activity(self)
 
 
 class SessionManager:
@@ -117,27 +145,74 @@ class SessionManager:
     @property
     def MAX_SESSIONS(self) -> int:
         """Maximum number of concurrent sessions."""
-        return settings.session_limit
+        return self._max_sessions
 
     @property
     def SESSION_TIMEOUT_MINUTES(self) -> int:
         """Session timeout in minutes."""
-        return settings.session_timeout_minutes
+        return self._timeout_minutes
 
     def __init__(self) -> None:
         self.sessions: dict[str, Session] = {}
+        self.reload_settings()
+        # Running sessions in start order, maintained via on_status_change
+        self._running: dict[str, Session] = {}
+        # Finished sessions in stop order; evicted first when at the limit
+        self._finished: dict[str, Session] = {}
+        # (last_activity, session_id) min-heap; entries superseded by a
+        # later activity update are skipped when popped
+        self._expiry_heap: list[tuple[float, str]] = []
+
+    def reload_settings(self) -> None:
+        """Re-read the session limit and timeout from settings."""
+        self._max_sessions = settings.session_limit
+        self._timeout_minutes = settings.session_timeout_minutes
+        self._timeout_seconds = self._timeout_minutes * 60
+
+    def _on_status_change(self, session: Session) -> None:
+        """Update the running/finished indexes after a status change."""
+        status = session.status
+        if status == SessionStatus.RUNNING:
+            self._running[session.id] = session
+        else:
+            self._running.pop(session.id, None)
+        if status == SessionStatus.FINISHED:
+            self._finished[session.id] = session
+        else:
+            self._finished.pop(session.id, None)
+
+    def _on_activity(self, session: Session) -> None:
+        """Record a session's new last_activity in the expiry heap."""
+        heapq.heappush(self._expiry_heap, (session.last_activity, session.id))
 
     def cleanup_expired(self) -> None:
         """Remove sessions that have exceeded the timeout."""
-        from datetime import timedelta
+        cutoff = time.monotonic() - self._timeout_seconds
+        heap = self._expiry_heap
+        while heap and heap[0][0] < cutoff:
+            last_activity, sid = heapq.heappop(heap)
+            session = self.sessions.get(sid)
+            if session is not None and session.last_activity == last_activity:
+                self.remove_session(sid)
 
-        cutoff = datetime.now() - timedelta(minutes=self.SESSION_TIMEOUT_MINUTES)
-        expired_ids = [
-            sid for sid, session in self.sessions.items()
-            if session.last_activity < cutoff
-        ]
-        for sid in expired_ids:
-            del self.sessions[sid]
+    def _evict_finished(self) -> bool:
+        """Remove the oldest finished session.
+
+        Returns:
+            True if a session was evicted, False if none was finished.
+        """
+        finished = self._finished
+        while finished:
+            session_id, session = next(iter(finished.items()))
+            del finished[session_id]
+            # Skip entries made stale by direct changes to sessions
+            if (
+                self.sessions.get(session_id) is session
+                and session.status == SessionStatus.FINISHED
+            ):
+                del self.sessions[session_id]
+                return True
+        return False
 
     def create_session(
         self, mode: TrainingMode, config: SessionConfig
@@ -152,19 +227,27 @@ class SessionManager:
             The created Session.
 
         Raises:
-            SessionLimitExceeded: If the maximum number of sessions is reached.
+            SessionLimitExceeded: If the maximum number of sessions is reached
+                and no finished session can be evicted.
         """
         # Cleanup expired sessions first
         self.cleanup_expired()
 
-        # Check limit
-        if len(self.sessions) >= self.MAX_SESSIONS:
-            raise SessionLimitExceeded(
-                f"Maximum number of sessions ({self.MAX_SESSIONS}) reached"
-            )
-
-        session = Session(mode=mode, config=config)
+        # Check limit, making room by evicting finished sessions first
+        while len(self.sessions) >= self._max_sessions:
+            if not self._evict_finished():
+                raise SessionLimitExceeded(
+                    f"Maximum number of sessions ({self._max_sessions}) reached"
+                )
+
+        session = Session(
+            mode=mode,
+            config=config,
+            on_status_change=self._on_status_change,
+            on_activity=self._on_activity,
+        )
         self.sessions[session.id] = session
+        self._on_activity(session)
         return session
 
     def get_session(self, session_id: str) -> Session | None:
@@ -185,6 +268,8 @@ class SessionManager:
             session_id: The session identifier.
         """
         self.sessions.pop(session_id, None)
+        self._running.pop(session_id, None)
+        self._finished.pop(session_id, None)
 
     def get_active_session(self) -> Session | None:
         """Get the currently running session.
@@ -192,7 +277,14 @@ class SessionManager:
         Returns:
             The running Session if any, None otherwise.
         """
-        for session in self.sessions.values():
-            if session.status == SessionStatus.RUNNING:
+        running = self._running
+        while running:
+            session_id, session = next(iter(running.items()))
+            # Entries go stale if sessions is modified directly (e.g. cleared)
+            if (
+                self.sessions.get(session_id) is session
+                and session.status == SessionStatus.RUNNING
+            ):
                 return session
+            del running[session_id]
         return None
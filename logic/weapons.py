@@ -1,6 +1,8 @@
 """Weapon profiles and configurations for fencing training."""
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from enum import Enum
+from types import MappingProxyType
 
 
 class WeaponType(Enum):
@@ -11,25 +13,35 @@ class WeaponType(Enum):
     SABRE = "sabre"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WeaponProfile:
     """Weapon-specific configuration affecting training.
 
     Attributes:
         weapon_type: The type of weapon.
         tempo_multiplier: Multiplier for tempo (1.0 = normal, <1 = slower, >1 = faster).
-        command_weights: Dict of command_id to weight (default 1.0, 0.0 = excluded).
-        additional_commands: List of weapon-specific commands to include.
+        command_weights: Read-only mapping of command_id to weight
+            (default 1.0, 0.0 = excluded).
+        additional_commands: Tuple of weapon-specific commands to include.
     """
 
     weapon_type: WeaponType
     tempo_multiplier: float
-    command_weights: dict[str, float] = field(default_factory=dict)
-    additional_commands: list[str] = field(default_factory=list)
+    command_weights: Mapping[str, float] = field(default_factory=dict)
+    additional_commands: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        """Freeze the containers so shared profiles cannot be mutated."""
+        object.__setattr__(
+            self, "command_weights", MappingProxyType(dict(self.command_weights))
+        )
+        object.__setattr__(
+            self, "additional_commands", tuple(self.additional_commands)
+        )
 
 
 # Pre-defined weapon profiles
-WEAPON_PROFILES: dict[str, WeaponProfile] = {
+WEAPON_PROFILES: Mapping[str, WeaponProfile] = MappingProxyType({
     "foil": WeaponProfile(
         weapon_type=WeaponType.FOIL,
         tempo_multiplier=1.0,
@@ -38,7 +50,7 @@ WEAPON_PROFILES: dict[str, WeaponProfile] = {
             "bond_avant": 0.8,
             "bond_arriere": 0.8,
         },
-        additional_commands=[],
+        additional_commands=(),
     ),
     "epee": WeaponProfile(
         weapon_type=WeaponType.EPEE,
@@ -49,7 +61,7 @@ WEAPON_PROFILES: dict[str, WeaponProfile] = {
             "bond_avant": 0.5,
             "bond_arriere": 0.5,
         },
-        additional_commands=[],
+        additional_commands=(),
     ),
     "sabre": WeaponProfile(
         weapon_type=WeaponType.SABRE,
@@ -60,9 +72,9 @@ WEAPON_PROFILES: dict[str, WeaponProfile] = {
             "bond_avant": 1.5,
             "bond_arriere": 1.0,
         },
-        additional_commands=["fleche"],
+        additional_commands=("fleche",),
     ),
-}
+})
 
 
 def get_weapon_profile(weapon: str) -> WeaponProfile:
@@ -1,22 +1,34 @@
 """FastAPI application for Fencing Drill."""
 import asyncio
+import json
 import logging
 import time
+from collections import deque
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Callable, Literal
 
-from fastapi import FastAPI, Form, HTTPException, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Depends, FastAPI, Form, HTTPException, Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from config import settings
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, ValidationError, field_validator, model_validator
+from pydantic import BaseModel, Field, ValidationError, model_validator
 from sse_starlette.sse import EventSourceResponse
 
-from logic.commands import COMMAND_SETS, COMMANDS, DRILL_PAIRS
-from logic.generator import PATTERNS
+from logic.commands import COMMAND_SETS, COMMANDS, DRILL_PAIRS, resolve_command_set
+from logic.generator import (
+    PATTERNS,
+    PositionTracker,
+    allowed_weapon_commands,
+    generate_combination_iter,
+    get_post_command_delay,
+    iter_random_intervals,
+    select_constrained_command,
+)
+from logic.phrases import get_phrases_for_difficulty, select_balanced_phrase
 from logic.session import (
     BasicConfig,
     CombinationConfig,
@@ -28,11 +40,22 @@ from logic.session import (
     SessionStatus,
     TrainingMode,
 )
+from logic.weapons import WEAPON_PROFILES, get_weapon_profile
 
 
 # SSE keepalive constant
 HEARTBEAT_INTERVAL_SECONDS = 30
 
+# How often expired sessions are swept in the background
+SESSION_CLEANUP_INTERVAL_SECONDS = 60
+
+# High-frequency, low-value paths that are not request-logged
+_SKIP_LOG_PATHS: frozenset[str] = frozenset({"/health", "/googlec9f039cb609e237c.html"})
+_SKIP_LOG_PREFIX = "/static/"
+
+# Body of every /health response, serialized once
+_HEALTH_OK = json.dumps({"status": "ok"}, separators=(",", ":")).encode()
+
 # Validation constants
 MIN_TEMPO_BPM = 30
 MAX_TEMPO_BPM = 120
@@ -49,132 +72,153 @@ MAX_WORK_SECONDS = 120
 MIN_REST_SECONDS = 5
 MAX_REST_SECONDS = 60
 
+# Allowed identifiers, fixed at import. Literal validation returns the
+# canonical (interned) constant rather than the submitted string.
+_ModeId = Literal[tuple(m.value for m in TrainingMode)]
+_WeaponId = Literal[tuple(WEAPON_PROFILES)]
+_PairId = Literal[tuple(DRILL_PAIRS)]
+_CommandSetId = Literal[tuple(COMMAND_SETS)]
+_PatternId = Literal[tuple(PATTERNS)]
+
+
+def _sse_event(event: str, data: str) -> bytes:
+    """Encode a single SSE message the way sse-starlette would.
+
+    EventSourceResponse passes bytes through untouched, so the event
+    loop can yield pre-encoded messages instead of dicts.
+
+    Args:
+        event: Event name.
+        data: Single-line payload (JSON text).
+
+    Returns:
+        The wire-format message.
+    """
+    return f"event: {event}\r\ndata: {data}\r\n\r\n".encode()
+
+
+# SSE messages that never change, encoded once
+_COMMAND_EVENTS = {
+    cmd_id: _sse_event("command", cmd.to_json()) for cmd_id, cmd in COMMANDS.items()
+}
+_REST_EVENT = _sse_event("command", json.dumps({
+    "id": "rest",
+    "fr": "Repos",
+    "jp": "休憩",
+    "audio": "/static/audio/repos.mp3",
+}, ensure_ascii=False))
+_END_EVENT = _sse_event("end", json.dumps({"message": "終了"}, ensure_ascii=False))
+_HALTE_END_EVENTS = _COMMAND_EVENTS["halte"] + _END_EVENT
+
+# Status payloads only carry ints and fixed strings, so they are formatted
+# straight into SSE bytes. Spacing matches json.dumps output.
+_REP_STATUS = b'event: status\r\ndata: {"rep": %d, "total": %d}\r\n\r\n'
+_REMAINING_STATUS = b'event: status\r\ndata: {"remaining": "%d:%02d"}\r\n\r\n'
+_SET_STATUS = (
+    b'event: status\r\ndata: {"set": %d, "total_sets": %d, "phase": "%s", '
+    b'"remaining": "0:%02d"}\r\n\r\n'
+)
 
-class SessionStartRequest(BaseModel):
-    """Validated request for starting a session."""
-
-    mode: str
-    weapon: str = "foil"
-    pair_id: str = "marche_rompe"
-    repetitions: int = 10
-    tempo_bpm: int = 60
-    command_set: str = "beginner"
-    duration_seconds: int = 60
-    min_interval_ms: int = 1000
-    max_interval_ms: int = 3000
-    pattern_id: str = "A"
-    work_seconds: int = 30
-    rest_seconds: int = 15
-    sets: int = 5
-
-    @field_validator("mode")
-    @classmethod
-    def validate_mode(cls, v: str) -> str:
-        valid_modes = [m.value for m in TrainingMode]
-        if v not in valid_modes:
-            raise ValueError(f"Invalid mode: {v}. Must be one of {valid_modes}")
-        return v
-
-    @field_validator("weapon")
-    @classmethod
-    def validate_weapon(cls, v: str) -> str:
-        from logic.weapons import WEAPON_PROFILES
-
-        valid_weapons = list(WEAPON_PROFILES.keys())
-        if v not in valid_weapons:
-            raise ValueError(f"Invalid weapon: {v}. Must be one of {valid_weapons}")
-        return v
-
-    @field_validator("pair_id")
-    @classmethod
-    def validate_pair_id(cls, v: str) -> str:
-        if v not in DRILL_PAIRS:
-            raise ValueError(f"Invalid pair_id: {v}")
-        return v
-
-    @field_validator("command_set")
-    @classmethod
-    def validate_command_set(cls, v: str) -> str:
-        if v not in COMMAND_SETS:
-            raise ValueError(f"Invalid command_set: {v}")
-        return v
-
-    @field_validator("pattern_id")
-    @classmethod
-    def validate_pattern_id(cls, v: str) -> str:
-        if v not in PATTERNS:
-            raise ValueError(f"Invalid pattern_id: {v}")
-        return v
-
-    @field_validator("repetitions")
-    @classmethod
-    def validate_repetitions(cls, v: int) -> int:
-        if v < MIN_REPETITIONS or v > MAX_REPETITIONS:
-            raise ValueError(
-                f"repetitions must be between {MIN_REPETITIONS} and {MAX_REPETITIONS}"
-            )
-        return v
 
-    @field_validator("tempo_bpm")
-    @classmethod
-    def validate_tempo_bpm(cls, v: int) -> int:
-        if v < MIN_TEMPO_BPM or v > MAX_TEMPO_BPM:
-            raise ValueError(
-                f"tempo_bpm must be between {MIN_TEMPO_BPM} and {MAX_TEMPO_BPM}"
-            )
-        return v
+async def _sleep_until(deadline: float, now: Callable[[], float]) -> float:
+    """Sleep until an absolute loop-clock deadline.
 
-    @field_validator("duration_seconds")
-    @classmethod
-    def validate_duration_seconds(cls, v: int) -> int:
-        if v < MIN_DURATION_SECONDS or v > MAX_DURATION_SECONDS:
-            raise ValueError(
-                f"duration_seconds must be between {MIN_DURATION_SECONDS} and {MAX_DURATION_SECONDS}"
-            )
-        return v
+    Scheduling against deadlines keeps the time spent between sleeps from
+    accumulating as tempo drift. If the deadline has already passed (e.g.
+    a slow client), the schedule restarts from now instead of bursting.
 
-    @field_validator("min_interval_ms")
-    @classmethod
-    def validate_min_interval_ms(cls, v: int) -> int:
-        if v < MIN_INTERVAL_MS or v > MAX_INTERVAL_MS:
-            raise ValueError(
-                f"min_interval_ms must be between {MIN_INTERVAL_MS} and {MAX_INTERVAL_MS}"
-            )
-        return v
+    Args:
+        deadline: Target time on the event loop clock.
+        now: The event loop's time function.
 
-    @field_validator("max_interval_ms")
-    @classmethod
-    def validate_max_interval_ms(cls, v: int) -> int:
-        if v < MIN_INTERVAL_MS or v > MAX_INTERVAL_MS:
-            raise ValueError(
-                f"max_interval_ms must be between {MIN_INTERVAL_MS} and {MAX_INTERVAL_MS}"
-            )
-        return v
+    Returns:
+        The deadline that was actually slept until.
+    """
+    t = now()
+    if deadline <= t:
+        await asyncio.sleep(0)
+        return t
+    await asyncio.sleep(deadline - t)
+    return deadline
 
-    @field_validator("sets")
-    @classmethod
-    def validate_sets(cls, v: int) -> int:
-        if v < MIN_SETS or v > MAX_SETS:
-            raise ValueError(f"sets must be between {MIN_SETS} and {MAX_SETS}")
-        return v
 
-    @field_validator("work_seconds")
-    @classmethod
-    def validate_work_seconds(cls, v: int) -> int:
-        if v < MIN_WORK_SECONDS or v > MAX_WORK_SECONDS:
-            raise ValueError(
-                f"work_seconds must be between {MIN_WORK_SECONDS} and {MAX_WORK_SECONDS}"
-            )
-        return v
+class SessionStartRequest(BaseModel):
+    """Validated request for starting a session.
+
+    Membership and range checks are expressed as Literal and Field
+    constraints so pydantic-core validates them natively.
+    """
+
+    mode: _ModeId
+    weapon: _WeaponId = "foil"
+    pair_id: _PairId = "marche_rompe"
+    repetitions: Annotated[int, Field(ge=MIN_REPETITIONS, le=MAX_REPETITIONS)] = 10
+    tempo_bpm: Annotated[int, Field(ge=MIN_TEMPO_BPM, le=MAX_TEMPO_BPM)] = 60
+    command_set: _CommandSetId = "beginner"
+    duration_seconds: Annotated[
+        int, Field(ge=MIN_DURATION_SECONDS, le=MAX_DURATION_SECONDS)
+    ] = 60
+    min_interval_ms: Annotated[int, Field(ge=MIN_INTERVAL_MS, le=MAX_INTERVAL_MS)] = 1000
+    max_interval_ms: Annotated[int, Field(ge=MIN_INTERVAL_MS, le=MAX_INTERVAL_MS)] = 3000
+    pattern_id: _PatternId = "A"
+    work_seconds: Annotated[int, Field(ge=MIN_WORK_SECONDS, le=MAX_WORK_SECONDS)] = 30
+    rest_seconds: Annotated[int, Field(ge=MIN_REST_SECONDS, le=MAX_REST_SECONDS)] = 15
+    sets: Annotated[int, Field(ge=MIN_SETS, le=MAX_SETS)] = 5
 
-    @field_validator("rest_seconds")
     @classmethod
-    def validate_rest_seconds(cls, v: int) -> int:
-        if v < MIN_REST_SECONDS or v > MAX_REST_SECONDS:
-            raise ValueError(
-                f"rest_seconds must be between {MIN_REST_SECONDS} and {MAX_REST_SECONDS}"
+    def as_form(
+        cls,
+        mode: Annotated[str, Form()],
+        weapon: Annotated[str, Form()] = "foil",
+        pair_id: Annotated[str, Form()] = "marche_rompe",
+        repetitions: Annotated[int, Form()] = 10,
+        tempo_bpm: Annotated[int, Form()] = 60,
+        command_set: Annotated[str, Form()] = "beginner",
+        duration_seconds: Annotated[int, Form()] = 60,
+        min_interval_ms: Annotated[int, Form()] = 1000,
+        max_interval_ms: Annotated[int, Form()] = 3000,
+        pattern_id: Annotated[str, Form()] = "A",
+        work_seconds: Annotated[int, Form()] = 30,
+        rest_seconds: Annotated[int, Form()] = 15,
+        sets: Annotated[int, Form()] = 5,
+    ) -> "SessionStartRequest":
+        """Build a validated request from submitted form fields.
+
+        Used as a FastAPI dependency so handlers receive a single model.
+
+        Returns:
+            The validated SessionStartRequest.
+
+        Raises:
+            HTTPException: 422 with the validation errors if any field is invalid.
+        """
+        try:
+            return cls(
+                mode=mode,
+                weapon=weapon,
+                pair_id=pair_id,
+                repetitions=repetitions,
+                tempo_bpm=tempo_bpm,
+                command_set=command_set,
+                duration_seconds=duration_seconds,
+                min_interval_ms=min_interval_ms,
+                max_interval_ms=max_interval_ms,
+                pattern_id=pattern_id,
+                work_seconds=work_seconds,
+                rest_seconds=rest_seconds,
+                sets=sets,
             )
-        return v
+        except ValidationError as e:
+            # Convert validation errors to JSON-serializable format
+            errors = []
+            for error in e.errors():
+                err = {
+                    "loc": error.get("loc", []),
+                    "msg": error.get("msg", str(error)),
+                    "type": error.get("type", "validation_error"),
+                }
+                errors.append(err)
+            raise HTTPException(status_code=422, detail=errors)
 
     @model_validator(mode="after")
     def validate_intervals(self) -> "SessionStartRequest":
@@ -183,16 +227,94 @@ class SessionStartRequest(BaseModel):
             raise ValueError("min_interval_ms must be <= max_interval_ms")
         return self
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware to add security headers to all responses."""
 
-    async def dispatch(self, request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        return response
+# Config class and the validated request fields it takes, per training mode
+_MODE_CONFIGS: dict[TrainingMode, tuple[type, tuple[str, ...]]] = {
+    TrainingMode.BASIC: (
+        BasicConfig,
+        ("pair_id", "repetitions", "tempo_bpm", "weapon"),
+    ),
+    TrainingMode.RANDOM: (
+        RandomConfig,
+        ("command_set", "duration_seconds", "min_interval_ms", "max_interval_ms", "weapon"),
+    ),
+    TrainingMode.COMBINATION: (
+        CombinationConfig,
+        ("pattern_id", "repetitions", "tempo_bpm", "weapon"),
+    ),
+    TrainingMode.INTERVAL: (
+        IntervalConfig,
+        ("work_seconds", "rest_seconds", "sets", "tempo_bpm", "weapon"),
+    ),
+}
+
+
+class SecurityHeadersMiddleware:
+    """Middleware to add security headers to all responses.
+
+    Implemented as plain ASGI so streaming responses (SSE) pass through
+    without BaseHTTPMiddleware's per-request task and memory stream.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Content-Type-Options"] = "nosniff"
+                headers["X-Frame-Options"] = "DENY"
+                headers["X-XSS-Protection"] = "1; mode=block"
+                headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class TimingLogMiddleware:
+    """Log each HTTP request with its status code and time to first byte.
+
+    The log line is written when the response starts, so long-lived SSE
+    streams are logged as soon as they open. Health checks and static
+    files are passed straight through.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        if (
+            path in _SKIP_LOG_PATHS
+            or path.startswith(_SKIP_LOG_PREFIX)
+            or not logger.isEnabledFor(logging.INFO)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        async def send_with_logging(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                process_time = time.perf_counter() - start_time
+                logger.info(
+                    "%s %s - %d (%.3fs)",
+                    scope["method"],
+                    scope["path"],
+                    message["status"],
+                    process_time,
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_logging)
 
 
 # Setup logging
@@ -205,38 +327,75 @@ logger.info("Fencing Drill application starting")
 
 app = FastAPI(title="Fencing Drill")
 app.add_middleware(SecurityHeadersMiddleware)
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all HTTP requests and responses."""
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    logger.info(
-        f"{request.method} {request.url.path} - {response.status_code} ({process_time:.3f}s)"
-    )
-    return response
+app.add_middleware(TimingLogMiddleware)
 
 
 # Setup paths
 BASE_DIR = Path(__file__).parent
 templates = Jinja2Templates(directory=BASE_DIR / "templates")
 
+# Idle fragment returned by /session/stop is static, so render it once
+_SESSION_IDLE_HTML: bytes = templates.get_template(
+    "components/session_idle.html"
+).render().encode()
+
+# Fragment shown when the session limit is reached; also static
+_SESSION_BUSY_HTML: bytes = templates.get_template(
+    "components/session_busy.html"
+).render().encode()
+
+# Active fragment returned by /session/start. Only the session ID and
+# repetition count vary, so it is rendered once with slot markers, split
+# around them, and joined per request.
+_SLOT = "\x00"
+_SESSION_ACTIVE_PARTS = tuple(
+    templates.get_template("components/session_active.html")
+    .render(session_id=_SLOT, repetitions=_SLOT)
+    .split(_SLOT)
+)
+
+# Settings partials are static, so render each one once
+_RENDERED_SETTINGS: dict[str, bytes] = {
+    mode.value: templates.get_template(
+        f"components/settings_{mode.value}.html"
+    ).render().encode()
+    for mode in TrainingMode
+}
+
 # Mount static files
 app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
 
 # Session manager (single instance for the app)
 session_manager = SessionManager()
+_cleanup_task: asyncio.Task | None = None
+
+
+async def _cleanup_sessions_periodically() -> None:
+    """Sweep expired sessions even when no new sessions are being created."""
+    while True:
+        await asyncio.sleep(SESSION_CLEANUP_INTERVAL_SECONDS)
+        session_manager.cleanup_expired()
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the background session cleanup task."""
+    global _cleanup_task
+    if _cleanup_task is None or _cleanup_task.done():
+        _cleanup_task = asyncio.create_task(_cleanup_sessions_periodically())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up sessions on application shutdown."""
+    global _cleanup_task
     logger.info("Fencing Drill application shutting down")
+    if _cleanup_task is not None:
+        _cleanup_task.cancel()
+        _cleanup_task = None
     # Stop all active sessions
     for session in list(session_manager.sessions.values()):
-        if session.status == SessionStatus.RUNNING:
+        if session.is_running:
             session.stop()
     # Clear all sessions
     session_manager.sessions.clear()
@@ -246,7 +405,7 @@ async def shutdown_event():
 @app.get("/health")
 async def health():
     """Health check endpoint for monitoring."""
-    return {"status": "ok"}
+    return Response(content=_HEALTH_OK, media_type="application/json")
 
 
 @app.get("/googlec9f039cb609e237c.html")
@@ -267,62 +426,19 @@ async def root(request: Request):
 @app.get("/settings/{mode}", response_class=HTMLResponse)
 async def get_settings(request: Request, mode: str):
     """Get settings panel HTML fragment for a training mode."""
-    valid_modes = [m.value for m in TrainingMode]
-    if mode not in valid_modes:
+    rendered = _RENDERED_SETTINGS.get(mode)
+    if rendered is None:
         raise HTTPException(status_code=404, detail=f"Invalid mode: {mode}")
 
-    return templates.TemplateResponse(
-        f"components/settings_{mode}.html", {"request": request}
-    )
+    return HTMLResponse(content=rendered)
 
 
 @app.post("/session/start", response_class=HTMLResponse)
 async def start_session(
     request: Request,
-    mode: Annotated[str, Form()],
-    weapon: Annotated[str, Form()] = "foil",
-    pair_id: Annotated[str, Form()] = "marche_rompe",
-    repetitions: Annotated[int, Form()] = 10,
-    tempo_bpm: Annotated[int, Form()] = 60,
-    command_set: Annotated[str, Form()] = "beginner",
-    duration_seconds: Annotated[int, Form()] = 60,
-    min_interval_ms: Annotated[int, Form()] = 1000,
-    max_interval_ms: Annotated[int, Form()] = 3000,
-    pattern_id: Annotated[str, Form()] = "A",
-    work_seconds: Annotated[int, Form()] = 30,
-    rest_seconds: Annotated[int, Form()] = 15,
-    sets: Annotated[int, Form()] = 5,
+    validated: Annotated[SessionStartRequest, Depends(SessionStartRequest.as_form)],
 ):
     """Start a training session."""
-    # Validate input using Pydantic model
-    try:
-        validated = SessionStartRequest(
-            mode=mode,
-            weapon=weapon,
-            pair_id=pair_id,
-            repetitions=repetitions,
-            tempo_bpm=tempo_bpm,
-            command_set=command_set,
-            duration_seconds=duration_seconds,
-            min_interval_ms=min_interval_ms,
-            max_interval_ms=max_interval_ms,
-            pattern_id=pattern_id,
-            work_seconds=work_seconds,
-            rest_seconds=rest_seconds,
-            sets=sets,
-        )
-    except ValidationError as e:
-        # Convert validation errors to JSON-serializable format
-        errors = []
-        for error in e.errors():
-            err = {
-                "loc": error.get("loc", []),
-                "msg": error.get("msg", str(error)),
-                "type": error.get("type", "validation_error"),
-            }
-            errors.append(err)
-        raise HTTPException(status_code=422, detail=errors)
-
     # Stop any existing session
     active = session_manager.get_active_session()
     if active:
@@ -331,123 +447,36 @@ async def start_session(
     # Create config based on mode
     training_mode = TrainingMode(validated.mode)
 
-    if training_mode == TrainingMode.BASIC:
-        config = BasicConfig(
-            pair_id=validated.pair_id,
-            repetitions=validated.repetitions,
-            tempo_bpm=validated.tempo_bpm,
-            weapon=validated.weapon,
-        )
-    elif training_mode == TrainingMode.RANDOM:
-        config = RandomConfig(
-            command_set=validated.command_set,
-            duration_seconds=validated.duration_seconds,
-            min_interval_ms=validated.min_interval_ms,
-            max_interval_ms=validated.max_interval_ms,
-            weapon=validated.weapon,
-        )
-    elif training_mode == TrainingMode.COMBINATION:
-        config = CombinationConfig(
-            pattern_id=validated.pattern_id,
-            repetitions=validated.repetitions,
-            tempo_bpm=validated.tempo_bpm,
-            weapon=validated.weapon,
-        )
-    elif training_mode == TrainingMode.INTERVAL:
-        config = IntervalConfig(
-            work_seconds=validated.work_seconds,
-            rest_seconds=validated.rest_seconds,
-            sets=validated.sets,
-            tempo_bpm=validated.tempo_bpm,
-            weapon=validated.weapon,
-        )
-    else:
-        config = BasicConfig()
+    config_cls, fields = _MODE_CONFIGS[training_mode]
+    config = config_cls(**{name: getattr(validated, name) for name in fields})
 
     try:
         session = session_manager.create_session(mode=training_mode, config=config)
     except SessionLimitExceeded:
         return HTMLResponse(
-            content="""
-            <div id="session-container">
-                <section class="relative bg-fencing-surface/30 rounded-2xl border border-red-500/50 overflow-hidden">
-                    <div class="relative px-6 py-16 min-h-[200px] flex flex-col items-center justify-center text-center">
-                        <div class="w-16 h-16 mx-auto mb-4 rounded-full border-2 border-red-500/50 flex items-center justify-center">
-                            <svg class="w-8 h-8 text-red-400" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z"></path>
-                            </svg>
-                        </div>
-                        <p class="text-red-400 text-lg font-medium mb-2" data-i18n="error.server_busy">サーバーが混み合っています</p>
-                        <p class="text-fencing-steel/70 text-sm" data-i18n="error.try_later">しばらくお待ちいただいてから再度お試しください</p>
-                    </div>
-                </section>
-            </div>
-            """,
+            content=_SESSION_BUSY_HTML,
             status_code=429,
         )
 
     session.start()
 
     # Return HTML fragment with session info
+    head, after_id, tail = _SESSION_ACTIVE_PARTS
     return HTMLResponse(
-        content=f"""
-        <div id="session-container" data-session-id="{session.id}">
-            <section class="relative bg-fencing-surface/30 rounded-2xl border border-fencing-surface-light/50 overflow-hidden">
-                <div class="absolute inset-0 opacity-5">
-                    <div class="absolute top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2 w-96 h-96 rounded-full bg-fencing-gold blur-3xl"></div>
-                </div>
-                <div class="relative border-b border-fencing-surface-light/30 px-6 py-3 flex justify-between items-center">
-                    <div class="flex items-center gap-3">
-                        <span class="text-xs text-fencing-steel/50 uppercase tracking-wider">Session Active</span>
-                        <span class="w-2 h-2 bg-emerald-500 rounded-full animate-pulse"></span>
-                    </div>
-                    <div class="flex items-center gap-4 text-sm">
-                        <div class="flex items-center gap-2">
-                            <svg class="w-4 h-4 text-fencing-steel/50" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 8v4l3 3m6-3a9 9 0 11-18 0 9 9 0 0118 0z"></path>
-                            </svg>
-                            <span class="text-fencing-steel/70" id="remaining-time">--:--</span>
-                        </div>
-                        <div class="flex items-center gap-2">
-                            <span class="text-fencing-steel/50">#</span>
-                            <span class="text-fencing-steel/70" id="current-rep">0 / {getattr(config, 'repetitions', '--')}</span>
-                        </div>
-                    </div>
-                </div>
-                <div class="relative px-6 py-16 min-h-[320px] flex flex-col items-center justify-center" id="command-area">
-                    <div id="active-state" class="text-center">
-                        <div class="absolute inset-0 flex items-center justify-center pointer-events-none">
-                            <div class="w-64 h-64 rounded-full border border-fencing-gold/20 pulse-ring"></div>
-                        </div>
-                        <div class="relative">
-                            <p class="text-fencing-gold/60 text-sm uppercase tracking-[0.3em] mb-2" id="command-label-fr">準備中...</p>
-                            <p class="font-display text-7xl md:text-8xl text-fencing-silver command-display tracking-wide" id="command-text">—</p>
-                        </div>
-                    </div>
-                </div>
-                <div class="blade-line"></div>
-                <div class="relative px-6 py-6 flex justify-center gap-4">
-                    <button id="btn-stop"
-                            class="px-8 py-3 rounded-lg font-medium border border-fencing-surface-light text-fencing-steel hover:bg-fencing-surface-light transition-colors flex items-center gap-2"
-                            hx-post="/session/stop"
-                            hx-target="#session-container"
-                            hx-swap="innerHTML">
-                        <svg class="w-5 h-5" fill="currentColor" viewBox="0 0 24 24">
-                            <path d="M6 6h12v12H6z"></path>
-                        </svg>
-                        <span data-i18n="button.stop">停止</span>
-                    </button>
-                </div>
-            </section>
-        </div>
-        <script>
-            // Connect to SSE after DOM update
-            setTimeout(function() {{
-                startTraining("{session.id}");
-            }}, 100);
-        </script>
-        """,
+        content="".join((
+            head,
+            session.id,
+            after_id,
+            str(getattr(config, "repetitions", "--")),
+            tail,
+        )),
         status_code=200,
+        # Client opens the SSE stream as soon as the fragment is swapped in
+        headers={
+            "HX-Trigger-After-Swap": json.dumps(
+                {"startTraining": {"sessionId": session.id}}
+            )
+        },
     )
 
 
@@ -460,57 +489,7 @@ async def stop_session(request: Request):
 
     # Return idle state HTML
     return HTMLResponse(
-        content="""
-        <section class="relative bg-fencing-surface/30 rounded-2xl border border-fencing-surface-light/50 overflow-hidden">
-            <div class="absolute inset-0 opacity-5">
-                <div class="absolute top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2 w-96 h-96 rounded-full bg-fencing-gold blur-3xl"></div>
-            </div>
-            <div class="relative border-b border-fencing-surface-light/30 px-6 py-3 flex justify-between items-center">
-                <div class="flex items-center gap-3">
-                    <span class="text-xs text-fencing-steel/50 uppercase tracking-wider">Current Mode:</span>
-                    <span class="text-sm text-fencing-silver" id="current-mode-label">—</span>
-                </div>
-                <div class="flex items-center gap-4 text-sm">
-                    <div class="flex items-center gap-2">
-                        <svg class="w-4 h-4 text-fencing-steel/50" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 8v4l3 3m6-3a9 9 0 11-18 0 9 9 0 0118 0z"></path>
-                        </svg>
-                        <span class="text-fencing-steel/70" id="remaining-time">--:--</span>
-                    </div>
-                    <div class="flex items-center gap-2">
-                        <span class="text-fencing-steel/50">#</span>
-                        <span class="text-fencing-steel/70" id="current-rep">0 / --</span>
-                    </div>
-                </div>
-            </div>
-            <div class="relative px-6 py-16 min-h-[320px] flex flex-col items-center justify-center" id="command-area">
-                <div id="idle-state" class="text-center">
-                    <div class="w-24 h-24 mx-auto mb-6 rounded-full border-2 border-dashed border-fencing-surface-light flex items-center justify-center">
-                        <svg class="w-10 h-10 text-fencing-steel/30" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="1.5" d="M14.752 11.168l-3.197-2.132A1 1 0 0010 9.87v4.263a1 1 0 001.555.832l3.197-2.132a1 1 0 000-1.664z"></path>
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="1.5" d="M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path>
-                        </svg>
-                    </div>
-                    <p class="text-fencing-steel/50 text-sm"><span data-i18n="status.idle">設定を確認して「開始」を押してください</span></p>
-                </div>
-            </div>
-            <div class="blade-line"></div>
-            <div class="relative px-6 py-6 flex justify-center gap-4">
-                <button id="btn-start"
-                        type="submit"
-                        form="settings-form"
-                        class="btn-primary px-8 py-3 rounded-lg font-medium text-fencing-dark flex items-center gap-2">
-                    <svg class="w-5 h-5" fill="currentColor" viewBox="0 0 24 24">
-                        <path d="M8 5v14l11-7z"></path>
-                    </svg>
-                    <span data-i18n="button.start">開始</span>
-                </button>
-            </div>
-        </section>
-        <script>
-            stopTraining();
-        </script>
-        """,
+        content=_SESSION_IDLE_HTML,
         status_code=200,
     )
 
@@ -522,12 +501,13 @@ async def get_session_status(session_id: str):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    return {
+    # Returning a Response skips FastAPI's jsonable_encoder pass
+    return JSONResponse({
         "id": session.id,
         "status": session.status.value,
         "mode": session.mode.value,
         "progress": session.progress,
-    }
+    })
 
 
 @app.post("/session/pause")
@@ -538,7 +518,7 @@ async def pause_session(session_id: str):
         raise HTTPException(status_code=404, detail="Session not found")
 
     session.pause()
-    return {"status": "paused", "session_id": session.id}
+    return JSONResponse({"status": "paused", "session_id": session.id})
 
 
 @app.post("/session/resume")
@@ -549,7 +529,7 @@ async def resume_session(session_id: str):
         raise HTTPException(status_code=404, detail="Session not found")
 
     session.resume()
-    return {"status": "running", "session_id": session.id}
+    return JSONResponse({"status": "running", "session_id": session.id})
 
 
 @app.get("/session/stream")
@@ -575,26 +555,14 @@ async def session_stream(session_id: str):
         yields in long-running operations. The sse-starlette library handles
         connection management.
         """
-        import json
-        import random
-
-        from logic.commands import COMMAND_SETS
-        from logic.generator import (
-            generate_combination,
-            get_post_command_delay,
-            select_constrained_command,
-        )
-        from logic.weapons import get_weapon_profile
-
         config = session.config
         profile = get_weapon_profile(config.weapon)
+        # Bind the loop clock once instead of looking up the loop per call
+        now = asyncio.get_running_loop().time
 
         # Send initial en_garde
         en_garde = COMMANDS["en_garde"]
-        yield {
-            "event": "command",
-            "data": json.dumps(en_garde.to_dict()),
-        }
+        yield _COMMAND_EVENTS[en_garde.id]
         await asyncio.sleep(2)  # Pause after en_garde
 
         if isinstance(config, BasicConfig):
@@ -604,79 +572,68 @@ async def session_stream(session_id: str):
             cmd2 = COMMANDS[cmd2_id]
             # Apply weapon tempo_multiplier: sabre faster, epee slower
             interval = 60.0 / (config.tempo_bpm * profile.tempo_multiplier)
+            deadline = now()
 
             for i in range(config.repetitions):
-                if session.status != SessionStatus.RUNNING:
+                if not session.is_running:
                     break
 
                 rep = i + 1
                 cmd = cmd1 if i % 2 == 0 else cmd2
-                yield {
-                    "event": "status",
-                    "data": json.dumps(
-                        {"rep": rep, "total": config.repetitions}
-                    ),
-                }
-                yield {
-                    "event": "command",
-                    "data": json.dumps(cmd.to_dict()),
-                }
-                await asyncio.sleep(interval)
+                # Status and command go out as one chunk (one write)
+                yield _REP_STATUS % (rep, config.repetitions) + _COMMAND_EVENTS[cmd.id]
+                deadline = await _sleep_until(deadline + interval, now)
 
         elif isinstance(config, CombinationConfig):
             # Combination mode: execute preset pattern
-            command_ids = generate_combination(config)
+            # Iterate lazily; the total is known from the pattern length
+            command_ids = generate_combination_iter(config)
             # Apply weapon tempo_multiplier: sabre faster, epee slower
             interval = 60.0 / (config.tempo_bpm * profile.tempo_multiplier)
-            total = len(command_ids)
+            total = len(PATTERNS[config.pattern_id]) * config.repetitions
+            deadline = now()
 
             for i, cmd_id in enumerate(command_ids):
-                if session.status != SessionStatus.RUNNING:
+                if not session.is_running:
                     break
 
                 rep = i + 1
                 cmd = COMMANDS[cmd_id]
 
-                yield {
-                    "event": "status",
-                    "data": json.dumps({"rep": rep, "total": total}),
-                }
-                yield {
-                    "event": "command",
-                    "data": json.dumps(cmd.to_dict()),
-                }
-                await asyncio.sleep(interval)
+                yield _REP_STATUS % (rep, total) + _COMMAND_EVENTS[cmd.id]
+                deadline = await _sleep_until(deadline + interval, now)
 
         elif isinstance(config, RandomConfig):
             # Random mode: phrase-based random commands with position balance
-            from logic.generator import PositionTracker
-            from logic.phrases import get_phrases_for_difficulty, select_balanced_phrase
-
-            start_time = asyncio.get_event_loop().time()
+            start_time = now()
             end_time = start_time + config.duration_seconds
+            deadline = start_time
 
-            # Get phrases and command set for difficulty level
+            # Get phrases and the commands this difficulty and weapon allow
             phrases = get_phrases_for_difficulty(config.command_set)
-            command_ids = COMMAND_SETS.get(config.command_set, ["marche", "rompe"])
+            allowed = allowed_weapon_commands(
+                resolve_command_set(config.command_set), config.weapon
+            )
 
             # Position tracking for balance
             tracker = PositionTracker()
-            history: list[str] = []
+            history: deque[str] = deque(maxlen=10)
             last_cmd: str | None = None
 
-            while (
-                asyncio.get_event_loop().time() < end_time
-                and session.status == SessionStatus.RUNNING
-            ):
+            # Base intervals with weapon tempo applied, drawn in batches
+            base_intervals = iter_random_intervals(
+                config.min_interval_ms, config.max_interval_ms, profile.tempo_multiplier
+            )
+            last_remaining: int | None = None
+
+            while now() < end_time and session.is_running:
                 # Select phrase based on current position
                 phrase = select_balanced_phrase(tracker.position, phrases)
 
                 # Execute commands from phrase
                 for phrase_cmd_id in phrase.commands:
-                    if (
-                        asyncio.get_event_loop().time() >= end_time
-                        or session.status != SessionStatus.RUNNING
-                    ):
+                    t = now()
+                    if t >= end_time or not session.is_running:
                         break
 
                     # Apply fendez->remise rule
@@ -687,82 +644,59 @@ async def session_stream(session_id: str):
                     if phrase_cmd_id == "remise" and last_cmd == "remise":
                         continue
 
-                    # Skip commands not in difficulty's command set
-                    if phrase_cmd_id not in command_ids:
+                    # Skip commands outside the command set or excluded by weapon
+                    if phrase_cmd_id not in allowed:
                         continue
 
-                    # Apply weapon filtering
-                    cmd_obj = COMMANDS.get(phrase_cmd_id)
-                    if cmd_obj and cmd_obj.is_weapon_specific:
-                        if cmd_obj.weapons and config.weapon not in cmd_obj.weapons:
-                            continue
-
-                    # Check weapon weight exclusions
-                    if phrase_cmd_id in profile.command_weights:
-                        if profile.command_weights[phrase_cmd_id] == 0.0:
-                            continue
-
                     cmd = COMMANDS[phrase_cmd_id]
 
                     # Update tracking
                     tracker.apply_command(phrase_cmd_id)
                     history.append(phrase_cmd_id)
-                    if len(history) > 10:
-                        history.pop(0)
                     last_cmd = phrase_cmd_id
 
-                    remaining = int(end_time - asyncio.get_event_loop().time())
-                    mins, secs = divmod(remaining, 60)
-
-                    yield {
-                        "event": "status",
-                        "data": json.dumps({"remaining": f"{mins}:{secs:02d}"}),
-                    }
-                    yield {
-                        "event": "command",
-                        "data": json.dumps(cmd.to_dict()),
-                    }
+                    # Only send status when the displayed second changes;
+                    # it is prepended to the command so both go in one chunk
+                    frame = _COMMAND_EVENTS[cmd.id]
+                    remaining = int(end_time - t)
+                    if remaining != last_remaining:
+                        last_remaining = remaining
+                        frame = _REMAINING_STATUS % divmod(remaining, 60) + frame
+                    yield frame
 
                     # Calculate interval with bond delay and weapon tempo
-                    base_interval = random.randint(
-                        config.min_interval_ms, config.max_interval_ms
-                    ) / 1000.0 / profile.tempo_multiplier
-                    interval = get_post_command_delay(phrase_cmd_id, base_interval)
-                    await asyncio.sleep(interval)
+                    interval = get_post_command_delay(phrase_cmd_id, next(base_intervals))
+                    deadline = await _sleep_until(deadline + interval, now)
 
         elif isinstance(config, IntervalConfig):
             # Interval mode: work/rest cycles with phrase-based commands
-            from logic.generator import PositionTracker
-            from logic.phrases import get_phrases_for_difficulty, select_balanced_phrase
-
-            command_ids = COMMAND_SETS["intermediate"]
+            allowed = allowed_weapon_commands(
+                resolve_command_set("intermediate"), config.weapon
+            )
             phrases = get_phrases_for_difficulty("intermediate")
             # Apply weapon tempo_multiplier: sabre faster, epee slower
             work_interval = 60.0 / (config.tempo_bpm * profile.tempo_multiplier)
 
             for set_num in range(1, config.sets + 1):
-                if session.status != SessionStatus.RUNNING:
+                if not session.is_running:
                     break
 
                 # Work phase with position tracking
                 tracker = PositionTracker()
-                history: list[str] = []
+                history: deque[str] = deque(maxlen=10)
                 last_cmd: str | None = None
-                work_start = asyncio.get_event_loop().time()
+                work_start = now()
                 work_end = work_start + config.work_seconds
+                deadline = work_start
+                last_remaining = None
 
-                while (
-                    asyncio.get_event_loop().time() < work_end
-                    and session.status == SessionStatus.RUNNING
-                ):
+                while now() < work_end and session.is_running:
                     # Select phrase based on position
                     phrase = select_balanced_phrase(tracker.position, phrases)
 
                     for phrase_cmd_id in phrase.commands:
-                        if (
-                            asyncio.get_event_loop().time() >= work_end
-                            or session.status != SessionStatus.RUNNING
-                        ):
+                        t = now()
+                        if t >= work_end or not session.is_running:
                             break
 
                         # Apply fendez->remise rule
@@ -774,94 +708,48 @@ async def session_stream(session_id: str):
                             continue
 
                         # Skip if not in intermediate command set
-                        if phrase_cmd_id not in command_ids:
+                        if phrase_cmd_id not in allowed:
                             continue
 
-                        # Apply weapon filtering
-                        cmd_obj = COMMANDS.get(phrase_cmd_id)
-                        if cmd_obj and cmd_obj.is_weapon_specific:
-                            if cmd_obj.weapons and config.weapon not in cmd_obj.weapons:
-                                continue
-
-                        if phrase_cmd_id in profile.command_weights:
-                            if profile.command_weights[phrase_cmd_id] == 0.0:
-                                continue
-
                         cmd = COMMANDS[phrase_cmd_id]
 
                         # Update tracking
                         tracker.apply_command(phrase_cmd_id)
                         history.append(phrase_cmd_id)
-                        if len(history) > 10:
-                            history.pop(0)
                         last_cmd = phrase_cmd_id
 
-                        remaining = int(work_end - asyncio.get_event_loop().time())
-
-                        yield {
-                            "event": "status",
-                            "data": json.dumps({
-                                "set": set_num,
-                                "total_sets": config.sets,
-                                "phase": "work",
-                                "remaining": f"0:{remaining:02d}",
-                            }),
-                        }
-                        yield {
-                            "event": "command",
-                            "data": json.dumps(cmd.to_dict()),
-                        }
+                        # Only send status when the displayed second changes;
+                        # it is prepended to the command so both go in one chunk
+                        frame = _COMMAND_EVENTS[cmd.id]
+                        remaining = int(work_end - t)
+                        if remaining != last_remaining:
+                            last_remaining = remaining
+                            frame = _SET_STATUS % (
+                                set_num, config.sets, b"work", remaining
+                            ) + frame
+                        yield frame
 
                         interval = get_post_command_delay(phrase_cmd_id, work_interval)
-                        await asyncio.sleep(interval)
+                        deadline = await _sleep_until(deadline + interval, now)
 
                 # Rest phase (except after last set)
-                if set_num < config.sets and session.status == SessionStatus.RUNNING:
+                if set_num < config.sets and session.is_running:
                     # Send rest command
-                    yield {
-                        "event": "status",
-                        "data": json.dumps({
-                            "set": set_num,
-                            "total_sets": config.sets,
-                            "phase": "rest",
-                            "remaining": f"0:{config.rest_seconds:02d}",
-                        }),
-                    }
-                    yield {
-                        "event": "command",
-                        "data": json.dumps({
-                            "id": "rest",
-                            "fr": "Repos",
-                            "jp": "休憩",
-                            "audio": "/static/audio/repos.mp3",
-                        }),
-                    }
+                    yield _SET_STATUS % (
+                        set_num, config.sets, b"rest", config.rest_seconds
+                    ) + _REST_EVENT
 
                     # Countdown during rest
+                    deadline = now()
                     for remaining in range(config.rest_seconds, 0, -1):
-                        if session.status != SessionStatus.RUNNING:
+                        if not session.is_running:
                             break
-                        yield {
-                            "event": "status",
-                            "data": json.dumps({
-                                "set": set_num,
-                                "total_sets": config.sets,
-                                "phase": "rest",
-                                "remaining": f"0:{remaining:02d}",
-                            }),
-                        }
-                        await asyncio.sleep(1)
-
-        # Send halte command before end event
-        halte = COMMANDS["halte"]
-        yield {
-            "event": "command",
-            "data": json.dumps(halte.to_dict()),
-        }
-        await asyncio.sleep(1)  # Brief pause after halte
-
-        # Send end event
-        yield {"event": "end", "data": json.dumps({"message": "終了"})}
+                        yield _SET_STATUS % (set_num, config.sets, b"rest", remaining)
+                        deadline = await _sleep_until(deadline + 1, now)
+
+        # Send halte and end together; the client holds the halte display
+        # while its audio plays, so the stream need not stay open for it
+        yield _HALTE_END_EVENTS
         session.stop()
 
     return EventSourceResponse(event_generator())
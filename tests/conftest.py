@@ -1,8 +1,10 @@
 """Pytest configuration for async tests."""
 import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def event_loop_policy():
     """Use default event loop policy."""
     import asyncio
@@ -13,3 +15,17 @@ def event_loop_policy():
 def anyio_backend():
     """Use asyncio as the async backend."""
     return "asyncio"
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def api_client():
+    """HTTP client for the app, shared by tests in the session event loop.
+
+    Tests using it must run with ``@pytest.mark.asyncio(loop_scope="session")``.
+    """
+    from main import app
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
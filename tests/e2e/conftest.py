@@ -1,9 +1,13 @@
 """E2E test fixtures for Playwright."""
 import pytest
-import subprocess
+import threading
 import time
 import socket
 
+import uvicorn
+
+SERVER_STARTUP_TIMEOUT_SECONDS = 10
+
 
 def get_free_port():
     """Get an available port."""
@@ -12,19 +16,42 @@ def get_free_port():
         return s.getsockname()[1]
 
 
-@pytest.fixture(scope="module")
+def wait_for_startup(server, thread, timeout=SERVER_STARTUP_TIMEOUT_SECONDS):
+    """Block until the uvicorn server reports it is accepting connections.
+
+    Args:
+        server: The uvicorn.Server being started.
+        thread: Thread running ``server.run``.
+        timeout: Maximum number of seconds to wait.
+
+    Raises:
+        RuntimeError: If the server exits or does not start in time.
+    """
+    deadline = time.monotonic() + timeout
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Server exited during startup")
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"Server did not start within {timeout}s")
+        time.sleep(0.05)
+
+
+@pytest.fixture(scope="session")
 def server():
-    """Start a test server for E2E tests."""
+    """Start one in-process test server shared by all E2E tests."""
     port = get_free_port()
-    proc = subprocess.Popen(
-        ["uvicorn", "main:app", "--port", str(port)],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    # Wait for server to start
-    time.sleep(2)
+    config = uvicorn.Config(app="main:app", port=port, log_level="warning")
+    uv_server = uvicorn.Server(config)
+    thread = threading.Thread(target=uv_server.run, daemon=True)
+    thread.start()
+    try:
+        wait_for_startup(uv_server, thread)
+    except RuntimeError:
+        uv_server.should_exit = True
+        thread.join(5)
+        raise
 
     yield f"http://localhost:{port}"
 
-    proc.terminate()
-    proc.wait(timeout=5)
+    uv_server.should_exit = True
+    thread.join(5)
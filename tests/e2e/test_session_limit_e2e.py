@@ -25,9 +25,8 @@ class TestSessionLimitE2E:
                 )
 
             # Make all sessions fresh to prevent cleanup
-            from datetime import datetime
             for session in session_manager.sessions.values():
-                session.last_activity = datetime.now()
+                session.touch()
 
             # Next request should get 429
             response = client.post(
@@ -59,9 +58,8 @@ class TestSessionLimitE2E:
                 )
 
             # Keep sessions fresh
-            from datetime import datetime
             for session in session_manager.sessions.values():
-                session.last_activity = datetime.now()
+                session.touch()
 
             response = client.post(
                 "/session/start",
@@ -1,6 +1,5 @@
 """Tests for main.py - FastAPI application and API endpoints."""
 import pytest
-from httpx import AsyncClient, ASGITransport
 
 
 class TestAppSetup:
@@ -20,13 +19,10 @@ class TestAppSetup:
 class TestRootEndpoint:
     """Test the root endpoint."""
 
-    @pytest.mark.asyncio
-    async def test_root_returns_html(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_root_returns_html(self, api_client):
         """GET / should return HTML."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/")
+        response = await api_client.get("/")
 
         assert response.status_code == 200
         assert "text/html" in response.headers["content-type"]
@@ -35,67 +31,86 @@ class TestRootEndpoint:
 class TestSessionStartEndpoint:
     """Test the session start endpoint."""
 
-    @pytest.mark.asyncio
-    async def test_start_session_basic_mode(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_start_session_basic_mode(self, api_client):
         """POST /session/start should create a basic mode session."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/session/start",
-                data={
-                    "mode": "basic",
-                    "pair_id": "marche_rompe",
-                    "repetitions": "10",
-                    "tempo_bpm": "60",
-                },
-            )
+        response = await api_client.post(
+            "/session/start",
+            data={
+                "mode": "basic",
+                "pair_id": "marche_rompe",
+                "repetitions": "10",
+                "tempo_bpm": "60",
+            },
+        )
 
         assert response.status_code == 200
         assert "text/html" in response.headers["content-type"]
 
-    @pytest.mark.asyncio
-    async def test_start_session_returns_session_id(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_start_session_returns_session_id(self, api_client):
         """POST /session/start should return session ID in response."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/session/start",
-                data={
-                    "mode": "basic",
-                    "pair_id": "marche_rompe",
-                    "repetitions": "10",
-                    "tempo_bpm": "60",
-                },
-            )
+        response = await api_client.post(
+            "/session/start",
+            data={
+                "mode": "basic",
+                "pair_id": "marche_rompe",
+                "repetitions": "10",
+                "tempo_bpm": "60",
+            },
+        )
 
         # Response should contain data-session-id attribute
         assert "data-session-id" in response.text
 
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_start_session_triggers_client_event(self, api_client):
+        """POST /session/start should signal the client via HX-Trigger-After-Swap."""
+        import json
+
+        response = await api_client.post(
+            "/session/start",
+            data={
+                "mode": "basic",
+                "pair_id": "marche_rompe",
+                "repetitions": "10",
+                "tempo_bpm": "60",
+            },
+        )
+
+        trigger = json.loads(response.headers["HX-Trigger-After-Swap"])
+        assert trigger["startTraining"]["sessionId"] in response.text
+        assert "<script>" not in response.text
+
+    def test_session_active_template_has_two_slots(self):
+        """The active fragment should split into parts around id and repetitions."""
+        from main import _SESSION_ACTIVE_PARTS
+
+        head, after_id, tail = _SESSION_ACTIVE_PARTS
+        assert head.endswith('data-session-id="')
+        assert after_id.endswith('id="current-rep">0 / ')
+        assert tail.startswith("</span>")
+
 
 class TestSessionStopEndpoint:
     """Test the session stop endpoint."""
 
-    @pytest.mark.asyncio
-    async def test_stop_session(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_stop_session(self, api_client):
         """POST /session/stop should stop the session."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            # First start a session
-            start_response = await client.post(
-                "/session/start",
-                data={
-                    "mode": "basic",
-                    "pair_id": "marche_rompe",
-                    "repetitions": "10",
-                    "tempo_bpm": "60",
-                },
-            )
+        # First start a session
+        start_response = await api_client.post(
+            "/session/start",
+            data={
+                "mode": "basic",
+                "pair_id": "marche_rompe",
+                "repetitions": "10",
+                "tempo_bpm": "60",
+            },
+        )
 
-            # Then stop it
-            response = await client.post("/session/stop")
+        # Then stop it
+        response = await api_client.post("/session/stop")
 
         assert response.status_code == 200
 
@@ -103,46 +118,46 @@ class TestSessionStopEndpoint:
 class TestSettingsEndpoint:
     """Test the settings endpoint."""
 
-    @pytest.mark.asyncio
-    async def test_get_basic_settings(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_basic_settings(self, api_client):
         """GET /settings/basic should return HTML fragment."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/settings/basic")
+        response = await api_client.get("/settings/basic")
 
         assert response.status_code == 200
         assert "text/html" in response.headers["content-type"]
 
-    @pytest.mark.asyncio
-    async def test_get_random_settings(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_random_settings(self, api_client):
         """GET /settings/random should return HTML fragment."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/settings/random")
+        response = await api_client.get("/settings/random")
 
         assert response.status_code == 200
         assert "text/html" in response.headers["content-type"]
 
-    @pytest.mark.asyncio
-    async def test_get_invalid_mode_settings(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_invalid_mode_settings(self, api_client):
         """GET /settings/invalid should return 404."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/settings/invalid")
+        response = await api_client.get("/settings/invalid")
 
         assert response.status_code == 404
 
+    def test_settings_prerendered_for_every_mode(self):
+        """Each training mode should have a pre-rendered settings partial."""
+        from logic.session import TrainingMode
+
+        from main import _RENDERED_SETTINGS
+
+        assert set(_RENDERED_SETTINGS) == {m.value for m in TrainingMode}
+        assert all(_RENDERED_SETTINGS.values())
+
 
 class TestSSEEndpoint:
     """Test the SSE stream endpoint."""
 
-    @pytest.mark.asyncio
-    async def test_stream_endpoint_exists(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_stream_endpoint_exists(self, api_client):
         """GET /session/stream should return event stream."""
-        from main import app, session_manager
+        from main import session_manager
         from logic.session import TrainingMode, BasicConfig
 
         # Create session directly via session manager
@@ -152,9 +167,8 @@ class TestSSEEndpoint:
         )
         session.start()
 
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            # Connect to stream with session_id
-            response = await client.get(f"/session/stream?session_id={session.id}", timeout=1.0)
+        # Connect to stream with session_id
+        response = await api_client.get(f"/session/stream?session_id={session.id}", timeout=1.0)
 
         # Should return event-stream content type
         assert response.status_code == 200
@@ -167,97 +181,84 @@ class TestSSEEndpoint:
 class TestWeaponParameter:
     """Test weapon parameter in session start."""
 
-    @pytest.mark.asyncio
-    async def test_start_session_with_weapon_foil(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_start_session_with_weapon_foil(self, api_client):
         """POST /session/start with weapon=foil should succeed."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/session/start",
-                data={
-                    "mode": "basic",
-                    "pair_id": "marche_rompe",
-                    "repetitions": "10",
-                    "tempo_bpm": "60",
-                    "weapon": "foil",
-                },
-            )
+        response = await api_client.post(
+            "/session/start",
+            data={
+                "mode": "basic",
+                "pair_id": "marche_rompe",
+                "repetitions": "10",
+                "tempo_bpm": "60",
+                "weapon": "foil",
+            },
+        )
 
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
-    async def test_start_session_with_weapon_epee(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_start_session_with_weapon_epee(self, api_client):
         """POST /session/start with weapon=epee should succeed."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/session/start",
-                data={
-                    "mode": "basic",
-                    "pair_id": "marche_rompe",
-                    "repetitions": "10",
-                    "tempo_bpm": "60",
-                    "weapon": "epee",
-                },
-            )
+        response = await api_client.post(
+            "/session/start",
+            data={
+                "mode": "basic",
+                "pair_id": "marche_rompe",
+                "repetitions": "10",
+                "tempo_bpm": "60",
+                "weapon": "epee",
+            },
+        )
 
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
-    async def test_start_session_with_weapon_sabre(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_start_session_with_weapon_sabre(self, api_client):
         """POST /session/start with weapon=sabre should succeed."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/session/start",
-                data={
-                    "mode": "basic",
-                    "pair_id": "marche_rompe",
-                    "repetitions": "10",
-                    "tempo_bpm": "60",
-                    "weapon": "sabre",
-                },
-            )
+        response = await api_client.post(
+            "/session/start",
+            data={
+                "mode": "basic",
+                "pair_id": "marche_rompe",
+                "repetitions": "10",
+                "tempo_bpm": "60",
+                "weapon": "sabre",
+            },
+        )
 
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
-    async def test_start_session_with_invalid_weapon(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_start_session_with_invalid_weapon(self, api_client):
         """POST /session/start with invalid weapon should return 422."""
-        from main import app
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/session/start",
-                data={
-                    "mode": "basic",
-                    "pair_id": "marche_rompe",
-                    "repetitions": "10",
-                    "tempo_bpm": "60",
-                    "weapon": "katana",
-                },
-            )
+        response = await api_client.post(
+            "/session/start",
+            data={
+                "mode": "basic",
+                "pair_id": "marche_rompe",
+                "repetitions": "10",
+                "tempo_bpm": "60",
+                "weapon": "katana",
+            },
+        )
 
         assert response.status_code == 422
 
-    @pytest.mark.asyncio
-    async def test_start_session_default_weapon_is_foil(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_start_session_default_weapon_is_foil(self, api_client):
         """POST /session/start without weapon should default to foil."""
-        from main import app, session_manager
-
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/session/start",
-                data={
-                    "mode": "basic",
-                    "pair_id": "marche_rompe",
-                    "repetitions": "10",
-                    "tempo_bpm": "60",
-                },
-            )
+        from main import session_manager
+
+        response = await api_client.post(
+            "/session/start",
+            data={
+                "mode": "basic",
+                "pair_id": "marche_rompe",
+                "repetitions": "10",
+                "tempo_bpm": "60",
+            },
+        )
 
         assert response.status_code == 200
         # Session should have been created with default weapon=foil
@@ -269,22 +270,19 @@ class TestWeaponParameter:
 class TestWeaponPairValidation:
     """Test weapon-pair compatibility validation."""
 
-    @pytest.mark.asyncio
-    async def test_pair_accepted_for_all_weapons(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_pair_accepted_for_all_weapons(self, api_client):
         """POST /session/start with marche_rompe pair should work for all weapons."""
-        from main import app
-
         for weapon in ["foil", "epee", "sabre"]:
-            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-                response = await client.post(
-                    "/session/start",
-                    data={
-                        "mode": "basic",
-                        "pair_id": "marche_rompe",
-                        "repetitions": "10",
-                        "tempo_bpm": "60",
-                        "weapon": weapon,
-                    },
-                )
+            response = await api_client.post(
+                "/session/start",
+                data={
+                    "mode": "basic",
+                    "pair_id": "marche_rompe",
+                    "repetitions": "10",
+                    "tempo_bpm": "60",
+                    "weapon": weapon,
+                },
+            )
 
             assert response.status_code == 200, f"marche_rompe should be valid for {weapon}"
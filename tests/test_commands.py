@@ -41,6 +41,49 @@ class TestCommand:
             "audio": "/static/audio/marche.mp3",
         }
 
+    def test_command_to_dict_is_read_only(self):
+        """Command.to_dict() should return a shared, read-only payload."""
+        from logic.commands import COMMANDS
+
+        cmd = COMMANDS["marche"]
+
+        assert cmd.to_dict() is cmd.to_dict()
+        with pytest.raises(TypeError):
+            cmd.to_dict()["id"] = "rompe"
+
+    def test_command_id_is_interned(self):
+        """Command IDs built from runtime strings should be interned."""
+        import sys
+
+        from logic.commands import Command
+
+        runtime_id = "".join(["mar", "che"])
+        cmd = Command(
+            id=runtime_id,
+            french="Marchez",
+            japanese="マルシェ",
+            audio_file="marche.mp3",
+        )
+
+        assert cmd.id is sys.intern("marche")
+
+    def test_command_to_json(self):
+        """Command.to_json should match the JSON encoding of to_dict."""
+        import json
+
+        from logic.commands import Command
+
+        cmd = Command(
+            id="marche",
+            french="Marchez",
+            japanese="マルシェ",
+            audio_file="marche.mp3",
+        )
+
+        assert json.loads(cmd.to_json()) == cmd.to_dict()
+        # Payload is precomputed once, not rebuilt per call
+        assert cmd.to_json() is cmd.to_json()
+
 
 class TestCommands:
     """Test the COMMANDS dictionary."""
@@ -143,6 +186,13 @@ class TestCommandSets:
         assert "balancez" in advanced
         assert len(advanced) == 7
 
+    def test_resolve_command_set(self):
+        """resolve_command_set should return tuples with a beginner fallback."""
+        from logic.commands import COMMAND_SETS, resolve_command_set
+
+        assert resolve_command_set("advanced") == tuple(COMMAND_SETS["advanced"])
+        assert resolve_command_set("unknown") == ("marche", "rompe")
+
 
 class TestGetCommand:
     """Test get_command helper function."""
@@ -51,6 +51,29 @@ class TestConfigDefaults:
         assert settings.base_url == ""
 
 
+class TestSettingsCaching:
+    """Test that settings are parsed once and immutable."""
+
+    def test_get_settings_is_cached(self, monkeypatch):
+        """get_settings should return the same instance without re-reading env."""
+        import config
+
+        first = config.get_settings()
+        monkeypatch.setenv("SESSION_LIMIT", "7")
+
+        assert config.get_settings() is first
+        assert config.settings is first
+
+    def test_settings_are_frozen(self):
+        """Settings should not be mutable after creation."""
+        from dataclasses import FrozenInstanceError
+
+        from config import settings
+
+        with pytest.raises(FrozenInstanceError):
+            settings.session_limit = 1
+
+
 class TestConfigFromEnv:
     """Test configuration from environment variables."""
 
@@ -128,7 +151,8 @@ class TestSessionManagerUsesConfig:
 
     def test_session_manager_uses_config_timeout(self, monkeypatch):
         """SessionManager should use SESSION_TIMEOUT_MINUTES from config."""
-        from datetime import datetime, timedelta
+        import time
+        from unittest.mock import patch
 
         monkeypatch.setenv("SESSION_TIMEOUT_MINUTES", "5")
 
@@ -145,7 +169,9 @@ class TestSessionManagerUsesConfig:
         s = manager.create_session(mode=TrainingMode.BASIC, config=BasicConfig())
 
         # Set session to 6 minutes old (past 5-minute timeout)
-        s.last_activity = datetime.now() - timedelta(minutes=6)
+        old_time = time.monotonic() - 6 * 60
+        with patch("logic.session.time.monotonic", return_value=old_time):
+            s.touch()
 
         manager.cleanup_expired()
 
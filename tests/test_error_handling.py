@@ -261,6 +261,17 @@ class TestInputValidation:
 
         assert response.status_code == 422
 
+    def test_validated_identifiers_are_canonical(self):
+        """Validated identifier fields should return the shared constant strings."""
+        import sys
+
+        from main import SessionStartRequest
+
+        validated = SessionStartRequest(mode="".join(["bas", "ic"]), weapon="".join(["sab", "re"]))
+
+        assert validated.mode is sys.intern("basic")
+        assert validated.weapon is sys.intern("sabre")
+
 
 class TestSSEErrors:
     """Test SSE endpoint error handling."""
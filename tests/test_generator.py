@@ -1,6 +1,10 @@
 """Tests for logic/generator.py - Command generation per mode."""
+from itertools import islice
+
 import pytest
 
+from logic.generator import iter_random_intervals
+
 
 class TestPatterns:
     """Test combination pattern definitions."""
@@ -18,7 +22,7 @@ class TestPatterns:
         from logic.generator import PATTERNS
 
         # マルシェ → マルシェ → アロンジェ・ル・ブラ → ファンドゥ → ルミーズ・アンギャルド
-        expected = ["marche", "marche", "allongez", "fendez", "remise"]
+        expected = ("marche", "marche", "allongez", "fendez", "remise")
         assert PATTERNS["A"] == expected
 
     def test_pattern_b_commands(self):
@@ -26,7 +30,7 @@ class TestPatterns:
         from logic.generator import PATTERNS
 
         # ロンペ → ロンペ → マルシェ → ファンドゥ → ルミーズ・アンギャルド
-        expected = ["rompe", "rompe", "marche", "fendez", "remise"]
+        expected = ("rompe", "rompe", "marche", "fendez", "remise")
         assert PATTERNS["B"] == expected
 
     def test_pattern_c_commands(self):
@@ -34,7 +38,7 @@ class TestPatterns:
         from logic.generator import PATTERNS
 
         # マルシェ → マルシェ → ロンペ → マルシェ → ロンペ → ロンペ
-        expected = ["marche", "marche", "rompe", "marche", "rompe", "rompe"]
+        expected = ("marche", "marche", "rompe", "marche", "rompe", "rompe")
         assert PATTERNS["C"] == expected
 
 
@@ -75,6 +79,17 @@ class TestCombinationGenerator:
         expected = pattern * 3
         assert result == expected
 
+    def test_generate_combination_iter_matches_list(self):
+        """generate_combination_iter should yield the same sequence lazily."""
+        from logic.generator import generate_combination, generate_combination_iter
+        from logic.session import CombinationConfig
+
+        config = CombinationConfig(pattern_id="C", repetitions=4, tempo_bpm=60)
+        result = generate_combination_iter(config)
+
+        assert not isinstance(result, list)
+        assert list(result) == generate_combination(config)
+
     def test_generate_combination_invalid_pattern(self):
         """generate_combination should raise KeyError for invalid pattern."""
         from logic.generator import generate_combination
@@ -112,6 +127,30 @@ class TestIntervalGenerator:
         for cmd_id in result:
             assert cmd_id in COMMANDS, f"Invalid command: {cmd_id}"
 
+    def test_interval_work_commands_respect_constraints(self):
+        """Bulk-drawn work commands should still obey fendez and wall rules."""
+        import random
+
+        from logic.generator import WALL_THRESHOLD, generate_interval_work_commands
+        from logic.session import IntervalConfig
+
+        random.seed(7)
+        config = IntervalConfig(work_seconds=120, tempo_bpm=120)
+        result = generate_interval_work_commands(config)
+
+        for prev, cmd in zip(result, result[1:]):
+            if prev == "fendez":
+                assert cmd == "remise"
+
+        streak_dir, streak_len = None, 0
+        for cmd in result:
+            direction = {"marche": "f", "rompe": "b"}.get(cmd)
+            if direction is None:
+                continue
+            streak_len = streak_len + 1 if direction == streak_dir else 1
+            streak_dir = direction
+            assert streak_len <= WALL_THRESHOLD
+
     def test_interval_work_count_based_on_tempo(self):
         """Number of work commands should be based on tempo and duration."""
         from logic.generator import generate_interval_work_commands
@@ -200,6 +239,40 @@ class TestRandomConstraints:
         history = ["marche", "marche", "marche"]
         assert is_wall_risk(history, "marche") is False
 
+    def test_streak_tracker_matches_count_consecutive_direction(self):
+        """StreakTracker should agree with a full history scan."""
+        from logic.generator import (
+            DIR_BACKWARD,
+            DIR_FORWARD,
+            StreakTracker,
+            count_consecutive_direction,
+        )
+
+        history = ["marche", "allongez", "marche", "rompe", "balancez", "rompe", "rompe"]
+        tracker = StreakTracker()
+        seen: list[str] = []
+        for cmd in history:
+            tracker.update(cmd)
+            seen.append(cmd)
+            for direction, code in (("forward", DIR_FORWARD), ("backward", DIR_BACKWARD)):
+                expected = count_consecutive_direction(seen, direction)
+                actual = tracker.length if tracker.direction == code else 0
+                assert actual == expected
+
+    def test_is_wall_risk_fast(self):
+        """is_wall_risk_fast should agree with is_wall_risk."""
+        from logic.generator import StreakTracker, is_wall_risk, is_wall_risk_fast
+
+        for history in (
+            ["marche"] * 4,
+            ["rompe"] * 4,
+            ["marche"] * 3,
+            ["marche", "marche", "balancez", "marche", "marche"],
+        ):
+            tracker = StreakTracker.from_history(history)
+            for proposed in ("marche", "bond_avant", "rompe", "balancez"):
+                assert is_wall_risk_fast(tracker, proposed) == is_wall_risk(history, proposed)
+
     def test_select_constrained_command_avoids_wall(self):
         """select_constrained_command should avoid wall risk."""
         from logic.generator import select_constrained_command
@@ -313,6 +386,76 @@ class TestSelectConstrainedCommandWithWeapon:
             assert cmd != "fleche", "Default (foil) should not select fleche"
 
 
+class TestSelectionContext:
+    """Test precomputed selection contexts."""
+
+    def test_build_context_is_cached(self):
+        """build_context should reuse the context for the same inputs."""
+        from logic.generator import build_context
+
+        ctx1 = build_context(["marche", "rompe", "balancez"], "sabre")
+        ctx2 = build_context(["marche", "rompe", "balancez"], "sabre")
+
+        assert ctx1 is ctx2
+
+    def test_build_context_applies_weapon(self):
+        """Context tables should reflect weapon filtering and weights."""
+        from logic.generator import build_context
+
+        ctx = build_context(["marche", "rompe", "balancez", "fleche"], "sabre")
+
+        assert "balancez" not in ctx.commands
+        assert "fleche" in ctx.commands
+        assert len(ctx.cum_weights) == len(ctx.commands)
+        assert ctx.cum_weights[-1] == pytest.approx(sum(w for _, w in ctx.weighted))
+
+    def test_pick_respects_weights(self):
+        """_pick should draw in proportion to the context weights."""
+        import random
+
+        from logic.generator import _pick, build_context
+
+        random.seed(42)
+        ctx = build_context(["marche", "rompe", "balancez"], "foil")
+        results = [_pick(ctx.commands, ctx.cum_weights) for _ in range(2000)]
+
+        # foil weights balancez at 0.3 vs 1.0 for the others
+        assert results.count("balancez") < results.count("marche")
+        assert set(results) == set(ctx.commands)
+
+    def test_without_direction_tables(self):
+        """Direction-excluded tables should drop only that direction."""
+        from logic.generator import DIR_FORWARD, build_context
+
+        ctx = build_context(["marche", "rompe", "fendez", "remise"])
+        commands, cum_weights = ctx.without_direction[DIR_FORWARD]
+
+        assert commands == ("rompe", "fendez", "remise")
+        assert len(cum_weights) == len(commands)
+
+    def test_select_with_context_avoids_wall(self):
+        """At the wall threshold, the streak's direction should be excluded."""
+        from logic.generator import (
+            DIR_FORWARD,
+            StreakTracker,
+            build_context,
+            select_with_context,
+        )
+
+        ctx = build_context(["marche", "rompe"])
+        streak = StreakTracker(direction=DIR_FORWARD, length=4)
+
+        for _ in range(50):
+            assert select_with_context(ctx, [], "rompe", streak) != "marche"
+
+    def test_select_with_context_forces_remise(self):
+        """select_with_context should apply the fendez rule."""
+        from logic.generator import build_context, select_with_context
+
+        ctx = build_context(["marche", "rompe", "fendez", "remise"])
+        assert select_with_context(ctx, [], "fendez") == "remise"
+
+
 class TestIntervalDelay:
     """Test delay calculations for interval mode."""
 
@@ -334,6 +477,13 @@ class TestIntervalDelay:
         assert get_post_command_delay("bond_avant", base_delay) == expected
         assert get_post_command_delay("bond_arriere", base_delay) == expected
 
+    def test_iter_random_intervals_in_range(self):
+        """Random intervals should stay within the scaled millisecond bounds."""
+        delays = list(islice(iter_random_intervals(1000, 3000, 2.0, batch_size=8), 50))
+
+        assert len(delays) == 50
+        assert all(0.5 <= d <= 1.5 for d in delays)
+
 
 class TestWeaponCommandFiltering:
     """Test weapon-based command filtering."""
@@ -413,6 +563,47 @@ class TestWeaponWeights:
         assert ("balancez", 0.3) in result
 
 
+class TestWeaponFilteringCache:
+    """Test memoization of weapon filtering and weighting."""
+
+    def test_filter_commands_for_weapon_returns_fresh_list(self):
+        """Cached results should not leak mutations between callers."""
+        from logic.generator import filter_commands_for_weapon
+        from logic.weapons import get_weapon_profile
+
+        profile = get_weapon_profile("sabre")
+        first = filter_commands_for_weapon(["marche", "rompe"], "sabre", profile)
+        first.append("mutated")
+        second = filter_commands_for_weapon(["marche", "rompe"], "sabre", profile)
+
+        assert second == ["marche", "rompe", "fleche"]
+
+    def test_weapon_weighted_commands_is_memoized(self):
+        """Repeated lookups for a command set and weapon should hit the cache."""
+        from logic.generator import weapon_weighted_commands
+
+        command_ids = ("marche", "balancez", "fleche")
+        weapon_weighted_commands(command_ids, "sabre")
+        hits = weapon_weighted_commands.cache_info().hits
+        result = weapon_weighted_commands(command_ids, "sabre")
+
+        assert weapon_weighted_commands.cache_info().hits == hits + 1
+        assert result == (("marche", 1.0), ("fleche", 1.0))
+
+    def test_allowed_weapon_commands_excludes_weapon_filtered(self):
+        """The allowed set should drop zero-weight and off-weapon commands."""
+        from logic.commands import COMMAND_SETS
+        from logic.generator import allowed_weapon_commands
+
+        command_set = tuple(COMMAND_SETS["advanced"])
+        sabre = allowed_weapon_commands(command_set, "sabre")
+        foil = allowed_weapon_commands(command_set, "foil")
+
+        assert sabre <= set(command_set)
+        assert "balancez" not in sabre
+        assert "balancez" in foil
+
+
 class TestWeightedSelection:
     """Test weighted random command selection."""
 
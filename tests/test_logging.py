@@ -33,11 +33,11 @@ class TestRequestLogging:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test"
             ) as client:
-                await client.get("/health")
+                await client.get("/settings/basic")
 
         # Should log the request
         log_messages = [record.message for record in caplog.records]
-        assert any("GET" in msg and "/health" in msg for msg in log_messages)
+        assert any("GET" in msg and "/settings/basic" in msg for msg in log_messages)
 
     @pytest.mark.asyncio
     async def test_request_logging_includes_status_code(self, caplog):
@@ -48,8 +48,24 @@ class TestRequestLogging:
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test"
             ) as client:
-                await client.get("/health")
+                await client.get("/settings/basic")
 
         # Should log the status code
         log_messages = [record.message for record in caplog.records]
         assert any("200" in msg for msg in log_messages)
+
+    @pytest.mark.asyncio
+    async def test_health_and_static_not_logged(self, caplog):
+        """Health checks and static files should bypass request logging."""
+        from main import app
+
+        with caplog.at_level(logging.INFO):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                await client.get("/health")
+                await client.get("/static/sw.js")
+
+        log_messages = [r.message for r in caplog.records if r.name == "main"]
+        assert not any("/health" in msg for msg in log_messages)
+        assert not any("/static/" in msg for msg in log_messages)
@@ -13,14 +13,14 @@ class TestPhraseDefinition:
         phrase = Phrase(
             id="test",
             name="Test Phrase",
-            commands=["marche", "rompe"],
+            commands=("marche", "rompe"),
             net_movement=0.0,
             difficulty="beginner",
         )
 
         assert phrase.id == "test"
         assert phrase.name == "Test Phrase"
-        assert phrase.commands == ["marche", "rompe"]
+        assert phrase.commands == ("marche", "rompe")
         assert phrase.net_movement == 0.0
         assert phrase.difficulty == "beginner"
 
@@ -31,6 +31,20 @@ class TestPhraseDefinition:
         assert isinstance(PHRASES, dict)
         assert len(PHRASES) > 0
 
+    def test_phrases_are_immutable(self):
+        """Phrase commands should be tuples and phrases frozen."""
+        import dataclasses
+
+        import pytest
+
+        from logic.phrases import PHRASES
+
+        for phrase in PHRASES.values():
+            assert isinstance(phrase.commands, tuple)
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            PHRASES["simple_advance"].weight = 2.0
+
     def test_phrase_net_movement_matches_sum(self):
         """Each phrase's net_movement should match sum of command position effects."""
         from logic.phrases import PHRASES
@@ -95,6 +109,15 @@ class TestPhrasesByDifficulty:
 
         assert phrases == beginner
 
+    def test_phrase_buckets_are_precomputed(self):
+        """Repeated lookups should return the same shared tuple."""
+        from logic.phrases import get_phrases_for_difficulty
+
+        first = get_phrases_for_difficulty("intermediate")
+
+        assert isinstance(first, tuple)
+        assert get_phrases_for_difficulty("intermediate") is first
+
 
 class TestPhraseSelection:
     """Test position-aware phrase selection."""
@@ -109,6 +132,16 @@ class TestPhraseSelection:
         assert phrase is not None
         assert phrase in phrases
 
+    def test_select_balanced_phrase_accepts_custom_list(self):
+        """Phrase lists other than the difficulty buckets should still work."""
+        from logic.phrases import PHRASES, select_balanced_phrase
+
+        phrases = [PHRASES["simple_advance"], PHRASES["simple_retreat"]]
+
+        for _ in range(20):
+            assert select_balanced_phrase(0.0, phrases) in phrases
+        assert select_balanced_phrase(6.0, phrases) is PHRASES["simple_retreat"]
+
     def test_select_balanced_phrase_neutral_position(self):
         """At neutral position, should select from all phrases."""
         from logic.phrases import select_balanced_phrase, get_phrases_for_difficulty
@@ -83,6 +83,52 @@ class TestSession:
         assert session.id is not None
         assert len(session.id) > 0
 
+    def test_session_has_no_instance_dict(self):
+        """Session and configs should be slotted."""
+        from logic.session import Session, TrainingMode, BasicConfig
+
+        session = Session(mode=TrainingMode.BASIC, config=BasicConfig())
+
+        assert not hasattr(session, "__dict__")
+        assert not hasattr(session.config, "__dict__")
+
+    def test_is_running_tracks_status(self):
+        """is_running should mirror status == RUNNING through every transition."""
+        from logic.session import Session, TrainingMode, BasicConfig, SessionStatus
+
+        session = Session(mode=TrainingMode.BASIC, config=BasicConfig())
+        assert session.is_running is False
+
+        session.start()
+        assert session.is_running is True
+        session.pause()
+        assert session.is_running is False
+        session.resume()
+        assert session.is_running is True
+        session.stop()
+        assert session.is_running is False
+
+        running = Session(
+            mode=TrainingMode.BASIC, config=BasicConfig(), status=SessionStatus.RUNNING
+        )
+        assert running.is_running is True
+
+    def test_status_change_updates_flag_and_manager_together(self):
+        """start() should update is_running and the manager's index at once."""
+        from logic.session import BasicConfig, SessionManager, TrainingMode
+
+        manager = SessionManager()
+        session = manager.create_session(mode=TrainingMode.BASIC, config=BasicConfig())
+
+        session.start()
+        assert session.is_running is True
+        assert session.id in manager._running
+
+        session.stop()
+        assert session.is_running is False
+        assert session.id not in manager._running
+        assert session.id in manager._finished
+
     def test_session_initial_status(self):
         """Session should start in IDLE status."""
         from logic.session import Session, TrainingMode, BasicConfig, SessionStatus
@@ -191,6 +237,22 @@ class TestSessionManager:
         active = manager.get_active_session()
         assert active is session
 
+    def test_active_session_cleared_on_stop(self):
+        """Stopping or clearing sessions should drop them from the active index."""
+        from logic.session import SessionManager, TrainingMode, BasicConfig
+
+        manager = SessionManager()
+        first = manager.create_session(mode=TrainingMode.BASIC, config=BasicConfig())
+        second = manager.create_session(mode=TrainingMode.BASIC, config=BasicConfig())
+        first.start()
+        second.start()
+        first.stop()
+
+        assert manager.get_active_session() is second
+
+        manager.sessions.clear()
+        assert manager.get_active_session() is None
+
     def test_no_active_session_when_idle(self):
         """SessionManager should return None when no session is running."""
         from logic.session import SessionManager, TrainingMode, BasicConfig
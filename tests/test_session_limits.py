@@ -1,5 +1,6 @@
 """Tests for session limit and timeout functionality."""
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from unittest.mock import patch
 
 import pytest
@@ -24,18 +25,20 @@ class TestSessionTimestamps:
         session = Session(mode=TrainingMode.BASIC, config=BasicConfig())
 
         assert hasattr(session, "last_activity")
-        assert isinstance(session.last_activity, datetime)
+        assert isinstance(session.last_activity, float)
 
     def test_session_timestamps_initialized_to_now(self):
         """Session timestamps should be initialized to creation time."""
         from logic.session import BasicConfig, Session, TrainingMode
 
         before = datetime.now()
+        before_monotonic = time.monotonic()
         session = Session(mode=TrainingMode.BASIC, config=BasicConfig())
+        after_monotonic = time.monotonic()
         after = datetime.now()
 
         assert before <= session.created_at <= after
-        assert before <= session.last_activity <= after
+        assert before_monotonic <= session.last_activity <= after_monotonic
 
     def test_touch_updates_last_activity(self):
         """touch() should update last_activity timestamp."""
@@ -45,9 +48,9 @@ class TestSessionTimestamps:
         original_activity = session.last_activity
 
         # Wait a tiny bit to ensure time difference
-        with patch("logic.session.datetime") as mock_datetime:
-            future_time = original_activity + timedelta(seconds=10)
-            mock_datetime.now.return_value = future_time
+        with patch("logic.session.time") as mock_time:
+            future_time = original_activity + 10
+            mock_time.monotonic.return_value = future_time
 
             session.touch()
 
@@ -91,6 +94,24 @@ class TestSessionManagerLimits:
         assert hasattr(manager, "SESSION_TIMEOUT_MINUTES")
         assert manager.SESSION_TIMEOUT_MINUTES == 30
 
+    def test_reload_settings(self, monkeypatch):
+        """reload_settings should pick up changed settings."""
+        from config import Settings
+        from logic import session as session_module
+        from logic.session import SessionManager
+
+        manager = SessionManager()
+        monkeypatch.setattr(
+            session_module,
+            "settings",
+            Settings(session_limit=3, session_timeout_minutes=7),
+        )
+
+        manager.reload_settings()
+
+        assert manager.MAX_SESSIONS == 3
+        assert manager.SESSION_TIMEOUT_MINUTES == 7
+
     def test_max_sessions_limit_raises_exception(self):
         """create_session should raise SessionLimitExceeded when limit reached."""
         from logic.session import (
@@ -109,6 +130,27 @@ class TestSessionManagerLimits:
         with pytest.raises(SessionLimitExceeded):
             manager.create_session(mode=TrainingMode.BASIC, config=BasicConfig())
 
+    def test_limit_evicts_oldest_finished_session(self):
+        """create_session should evict the oldest finished session at the limit."""
+        from logic.session import BasicConfig, SessionManager, TrainingMode
+
+        manager = SessionManager()
+        created = [
+            manager.create_session(mode=TrainingMode.BASIC, config=BasicConfig())
+            for _ in range(manager.MAX_SESSIONS)
+        ]
+        created[5].stop()
+        created[2].stop()
+
+        new_session = manager.create_session(
+            mode=TrainingMode.BASIC, config=BasicConfig()
+        )
+
+        assert new_session.id in manager.sessions
+        assert created[5].id not in manager.sessions
+        assert created[2].id in manager.sessions
+        assert len(manager.sessions) == manager.MAX_SESSIONS
+
     def test_cleanup_expired_sessions(self):
         """cleanup_expired should remove sessions older than timeout."""
         from logic.session import BasicConfig, SessionManager, TrainingMode
@@ -117,13 +159,30 @@ class TestSessionManagerLimits:
         session = manager.create_session(mode=TrainingMode.BASIC, config=BasicConfig())
 
         # Simulate session being old
-        old_time = datetime.now() - timedelta(minutes=31)
-        session.last_activity = old_time
+        old_time = time.monotonic() - 31 * 60
+        with patch("logic.session.time.monotonic", return_value=old_time):
+            session.touch()
 
         manager.cleanup_expired()
 
         assert session.id not in manager.sessions
 
+    def test_cleanup_skips_superseded_activity(self):
+        """An old activity entry should not expire a session touched since."""
+        from logic.session import BasicConfig, SessionManager, TrainingMode
+
+        manager = SessionManager()
+        session = manager.create_session(mode=TrainingMode.BASIC, config=BasicConfig())
+
+        old_time = time.monotonic() - 31 * 60
+        with patch("logic.session.time.monotonic", return_value=old_time):
+            session.touch()
+        session.touch()
+
+        manager.cleanup_expired()
+
+        assert session.id in manager.sessions
+
     def test_cleanup_keeps_active_sessions(self):
         """cleanup_expired should keep sessions within timeout."""
         from logic.session import BasicConfig, SessionManager, TrainingMode
@@ -147,9 +206,10 @@ class TestSessionManagerLimits:
             manager.create_session(mode=TrainingMode.BASIC, config=BasicConfig())
 
         # Make all sessions expired
-        old_time = datetime.now() - timedelta(minutes=31)
-        for session in manager.sessions.values():
-            session.last_activity = old_time
+        old_time = time.monotonic() - 31 * 60
+        with patch("logic.session.time.monotonic", return_value=old_time):
+            for session in manager.sessions.values():
+                session.touch()
 
         # Should succeed because cleanup runs first
         new_session = manager.create_session(
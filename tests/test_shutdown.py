@@ -63,3 +63,22 @@ class TestShutdownEvent:
 
         # All sessions should be cleared
         assert len(session_manager.sessions) == 0
+
+
+class TestStartupEvent:
+    """Test startup event handler."""
+
+    @pytest.mark.asyncio
+    async def test_startup_starts_cleanup_task(self):
+        """Startup should start the cleanup task and shutdown should cancel it."""
+        import main
+
+        for handler in main.app.router.on_startup:
+            await handler()
+        task = main._cleanup_task
+        assert task is not None and not task.done()
+
+        for handler in main.app.router.on_shutdown:
+            await handler()
+        assert main._cleanup_task is None
+        assert task.cancelling() or task.cancelled()
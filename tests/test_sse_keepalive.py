@@ -84,3 +84,85 @@ class TestSSEHeartbeat:
 
         # Cleanup
         session_manager.remove_session(session.id)
+
+
+class TestSSEEncoding:
+    """Test pre-encoded SSE messages."""
+
+    def test_sse_event_matches_library_encoding(self):
+        """Pre-encoded events should match sse-starlette's own encoding."""
+        from sse_starlette.sse import ServerSentEvent
+
+        from main import _sse_event
+
+        data = json.dumps({"rep": 1, "total": 10})
+        assert _sse_event("status", data) == ServerSentEvent(
+            data=data, event="status"
+        ).encode()
+
+    def test_status_templates_match_json_encoding(self):
+        """Formatted status events should equal the json.dumps encoding."""
+        from main import _REMAINING_STATUS, _REP_STATUS, _SET_STATUS, _sse_event
+
+        assert _REP_STATUS % (3, 10) == _sse_event(
+            "status", json.dumps({"rep": 3, "total": 10})
+        )
+        assert _REMAINING_STATUS % divmod(65, 60) == _sse_event(
+            "status", json.dumps({"remaining": "1:05"})
+        )
+        assert _SET_STATUS % (2, 5, b"rest", 7) == _sse_event(
+            "status",
+            json.dumps({"set": 2, "total_sets": 5, "phase": "rest", "remaining": "0:07"}),
+        )
+
+    def test_command_events_cover_all_commands(self):
+        """Every command should have a pre-encoded event."""
+        from logic.commands import COMMANDS
+
+        from main import _COMMAND_EVENTS, _END_EVENT, _REST_EVENT
+
+        assert set(_COMMAND_EVENTS) == set(COMMANDS)
+        payload = _COMMAND_EVENTS["marche"].split(b"data: ", 1)[1].strip()
+        assert json.loads(payload)["id"] == "marche"
+
+        # Rest and end events share the commands' UTF-8 (non-escaped) encoding
+        rest = _REST_EVENT.split(b"data: ", 1)[1].strip()
+        assert json.loads(rest)["id"] == "rest"
+        assert "休憩".encode() in rest
+        end = _END_EVENT.split(b"data: ", 1)[1].strip()
+        assert json.loads(end) == {"message": "終了"}
+        assert "終了".encode() in end
+        assert b"\\u" not in rest + end
+
+    def test_halte_and_end_sent_as_one_chunk(self):
+        """The closing chunk should carry halte followed by end."""
+        from main import _COMMAND_EVENTS, _END_EVENT, _HALTE_END_EVENTS
+
+        assert _HALTE_END_EVENTS == _COMMAND_EVENTS["halte"] + _END_EVENT
+
+
+class TestSSEScheduling:
+    """Test deadline-based pacing of SSE events."""
+
+    @pytest.mark.asyncio
+    async def test_sleep_until_future_deadline(self):
+        """A future deadline should be slept until and returned unchanged."""
+        from main import _sleep_until
+
+        now = asyncio.get_running_loop().time
+        deadline = now() + 0.05
+
+        assert await _sleep_until(deadline, now) == deadline
+        assert now() >= deadline
+
+    @pytest.mark.asyncio
+    async def test_sleep_until_past_deadline_resets(self):
+        """A missed deadline should restart the schedule from now."""
+        from main import _sleep_until
+
+        now = asyncio.get_running_loop().time
+        before = now()
+
+        result = await _sleep_until(before - 10, now)
+
+        assert result >= before
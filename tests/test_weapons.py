@@ -41,7 +41,31 @@ class TestWeaponProfile:
         assert profile.weapon_type == WeaponType.FOIL
         assert profile.tempo_multiplier == 1.0
         assert profile.command_weights == {"balancez": 0.3}
-        assert profile.additional_commands == []
+        assert profile.additional_commands == ()
+
+    def test_weapon_profile_is_frozen(self):
+        """Shared weapon profiles should not be reassignable."""
+        import dataclasses
+
+        import pytest
+
+        from logic.weapons import get_weapon_profile
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            get_weapon_profile("foil").tempo_multiplier = 2.0
+
+    def test_weapon_profile_containers_are_read_only(self):
+        """Weights, additional commands and the profile table should be immutable."""
+        import pytest
+
+        from logic.weapons import WEAPON_PROFILES, get_weapon_profile
+
+        profile = get_weapon_profile("sabre")
+        with pytest.raises(TypeError):
+            profile.command_weights["balancez"] = 1.0
+        assert isinstance(profile.additional_commands, tuple)
+        with pytest.raises(TypeError):
+            WEAPON_PROFILES["foil"] = profile
 
 
 class TestWeaponProfiles:
@@ -94,14 +118,14 @@ class TestWeaponProfiles:
         from logic.weapons import WEAPON_PROFILES
 
         profile = WEAPON_PROFILES["foil"]
-        assert profile.additional_commands == []
+        assert profile.additional_commands == ()
 
     def test_epee_no_additional_commands(self):
         """Epee should have no additional commands."""
         from logic.weapons import WEAPON_PROFILES
 
         profile = WEAPON_PROFILES["epee"]
-        assert profile.additional_commands == []
+        assert profile.additional_commands == ()
 
     def test_sabre_includes_fleche(self):
         """Sabre should include fleche in additional_commands."""